@@ -0,0 +1,56 @@
+"""
+Compare Chrome launch profiles on the local fixture site (benchmarks.fixture_site):
+  default - the original headless launch
+  lean    - BrowserProfile(lean=True): unneeded Chrome features off, images,
+            fonts, media and analytics blocked
+
+For each profile, reports launch time, mean page load time, browser RSS after
+the loads, and the requests and bytes the site served per resource type.
+Needs Chrome and chromedriver, like the scrapers.
+
+Run from the repository root:
+    python -m benchmarks.bench_browser
+    python -m benchmarks.bench_browser --loads 50 --latency 30
+"""
+import time
+import argparse
+from ttb_driver import BrowserProfile, browser_rss, launch_chrome
+from benchmarks.fixture_site import FixtureSite
+
+PAGES = 2
+
+
+def run(name, profile, site, loads):
+    start = time.perf_counter()
+    driver = launch_chrome(profile)
+    launch_seconds = time.perf_counter() - start
+    site.reset_counts()
+    try:
+        start = time.perf_counter()
+        for i in range(loads):
+            driver.get(f"{site.url}page/{i % PAGES + 1}")
+        load_seconds = (time.perf_counter() - start) / loads
+        rss = browser_rss(driver)
+    finally:
+        driver.quit()
+    served = ", ".join(f"{kind} {site.requests[kind]} ({site.bytes[kind] / 1024:.0f} KiB)"
+                       for kind in sorted(site.requests))
+    rss_mib = f"{rss / 2 ** 20:.0f}" if rss else "?"
+    print(f"{name:<8} {launch_seconds * 1000:>9.0f} {load_seconds * 1000:>9.1f} {rss_mib:>8}  {served}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loads", type=int, default=20, help="page loads per profile (default: 20)")
+    parser.add_argument("--latency", type=float, default=0, help="added latency per response in ms")
+    args = parser.parse_args()
+
+    site = FixtureSite(latency=args.latency / 1000).start()
+    print(f"{'profile':<8} {'launch ms':>9} {'load ms':>9} {'RSS MiB':>8}  served")
+    run("default", BrowserProfile(), site, args.loads)
+    run("lean", BrowserProfile(lean=True), site, args.loads)
+    site.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Size and cost of the change feed (ttb_changes) against re-downloading every chunk.
+
+Takes a synthetic term (benchmarks.bench_packing.synthetic_courses), changes the
+availability and waitlist of --changed percent of its sections, swaps a few
+courses in and out, and reports how long the diff takes, how big the changes
+document is as Firestore counts it, and how that compares with the chunk
+documents a client would otherwise fetch. Also checks that the diff reports
+exactly what was changed.
+
+Run from the repository root:
+    python -m benchmarks.bench_changes                   # 8000 courses, 20% of sections changed
+    python -m benchmarks.bench_changes --courses 20000 --changed 50
+"""
+import copy
+import time
+import random
+import argparse
+from ttb_changes import change_entry
+from ttb_firestore import firestore_size, pack_chunks
+from benchmarks.bench_packing import synthetic_courses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=8000, help="courses in the term (default: 8000)")
+    parser.add_argument("--changed", type=float, default=20, help="percent of sections changed (default: 20)")
+    parser.add_argument("--swapped", type=int, default=20, help="courses removed and added (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    previous = synthetic_courses(args.courses, args.seed)
+    current = copy.deepcopy(previous)
+    removed = rng.sample(range(len(current)), args.swapped)
+    for index in sorted(removed, reverse=True):
+        del current[index]
+    sections = [section for course in current for section in course["sections"]]
+    changed = rng.sample(sections, int(len(sections) * args.changed / 100))
+    for section in changed:
+        # Always different from the synthetic values, so every one is a change.
+        section["availability"] = f"{rng.randint(0, 80)} of 81 "
+        section["waitlist"] = f"{rng.randint(0, 40)} students "
+    current.extend(synthetic_courses(args.courses + args.swapped, args.seed + 1)[-args.swapped:])
+
+    start = time.perf_counter()
+    entry = change_entry(previous, current)
+    seconds = time.perf_counter() - start
+    changes = entry["changes"]
+    modified_sections = sum(len(course.get("sections", {}).get("modified", {})) for course in changes["modified"])
+    chunks = list(pack_chunks(current))
+    chunk_bytes = sum(firestore_size(chunk) for chunk in chunks)
+    document_bytes = firestore_size(entry)
+    print(f"{len(current)} courses, {len(sections)} sections; {len(changed)} sections changed, "
+          f"{args.swapped} courses swapped")
+    print(f"diff:             {seconds * 1000:.0f} ms (digests included)")
+    print(f"changes document: {document_bytes / 1024:.0f} KiB "
+          f"({len(changes['added'])} added, {len(changes['removed'])} removed, "
+          f"{len(changes['modified'])} courses / {modified_sections} sections modified)")
+    print(f"chunk documents:  {chunk_bytes / 1024:.0f} KiB in {len(chunks)} documents "
+          f"({document_bytes / chunk_bytes:.1%} of it)")
+    if (modified_sections, len(changes["added"]), len(changes["removed"])) != (
+            len(changed), args.swapped, args.swapped):
+        print("MISMATCH: the diff does not match the changes made")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compare the two ways of reading a results page on the saved fixtures:
+  soup   - driver.page_source + BeautifulSoup (parse_courses_html)
+  script - in-page extraction returning JSON (extract_courses)
+
+Reports per-page wall-clock latency and Python CPU time for each path and checks
+that both produce the same records.
+
+Run from the repository root:
+    python -m benchmarks.bench_extraction            # both paths, needs Chrome
+    python -m benchmarks.bench_extraction --no-browser  # BeautifulSoup parse only
+"""
+import os
+import glob
+import time
+import argparse
+import warnings
+from course_parser import parse_courses_html, extract_courses
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "results_page_*.html")
+
+
+def measure(func, repeat):
+    """Run func repeat times; return (result, mean wall ms, mean Python CPU ms)."""
+    wall = cpu = 0.0
+    result = None
+    for i in range(repeat):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        result = func()
+        wall += time.perf_counter() - wall_start
+        cpu += time.process_time() - cpu_start
+    return result, wall / repeat * 1000, cpu / repeat * 1000
+
+
+def start_browser():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    return webdriver.Chrome(options=options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="runs per page and path (default: 20)")
+    parser.add_argument("--no-browser", action="store_true", help="only time the BeautifulSoup parse")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", FutureWarning)  # soupsieve's :contains deprecation
+
+    paths = sorted(glob.glob(FIXTURES))
+    driver = None if args.no_browser else start_browser()
+    print(f"{'page':<22} {'path':<7} {'courses':>7} {'wall ms':>9} {'cpu ms':>9}")
+    try:
+        for path in paths:
+            name = os.path.basename(path)
+            if driver is None:
+                with open(path, encoding="utf-8") as f:
+                    html = f.read()
+                courses, wall, cpu = measure(lambda: parse_courses_html(html), args.repeat)
+                print(f"{name:<22} {'soup':<7} {len(courses):>7} {wall:>9.2f} {cpu:>9.2f}")
+                continue
+
+            driver.get("file://" + os.path.abspath(path))
+            soup_courses, wall, cpu = measure(lambda: parse_courses_html(driver.page_source), args.repeat)
+            print(f"{name:<22} {'soup':<7} {len(soup_courses):>7} {wall:>9.2f} {cpu:>9.2f}")
+            script_courses, wall, cpu = measure(lambda: extract_courses(driver), args.repeat)
+            print(f"{name:<22} {'script':<7} {len(script_courses):>7} {wall:>9.2f} {cpu:>9.2f}")
+            if script_courses != soup_courses:
+                print(f"{name}: MISMATCH between soup and script output")
+    finally:
+        if driver is not None:
+            driver.quit()
+
+
+if __name__ == "__main__":
+    main()
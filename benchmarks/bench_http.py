@@ -0,0 +1,66 @@
+"""
+Time the browser-free HTTP fetch mode (ttb_http.TimetableClient) against the
+replay server, which serves the recorded API responses in benchmarks/fixtures/api.
+
+Reports wall-clock time per run for each worker count and checks that the
+records match what parse_courses_html reads from the saved result pages.
+
+Run from the repository root:
+    python -m benchmarks.bench_http
+    python -m benchmarks.bench_http --latency 150 --workers 1 2 4
+"""
+import os
+import glob
+import time
+import argparse
+import warnings
+from course_parser import parse_courses_html
+from ttb_http import DIVISIONS, TimetableClient
+from benchmarks.replay_server import ReplayServer
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "results_page_*.html")
+
+# The query the recordings in benchmarks/fixtures/api were made with.
+FIXTURE_SESSIONS = ["20259", "20261", "20259-20261"]
+
+
+def expected_records():
+    records = []
+    for path in sorted(glob.glob(FIXTURES)):
+        with open(path, encoding="utf-8") as f:
+            records.extend(parse_courses_html(f.read()))
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="runs per worker count (default: 20)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8],
+                        help="worker counts to time (default: 1 4 8)")
+    parser.add_argument("--latency", type=float, default=0, help="added server latency per response in ms")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", FutureWarning)  # soupsieve's :contains deprecation
+
+    expected = expected_records()
+    server = ReplayServer(latency=args.latency / 1000).start()
+    print(f"{'workers':>7} {'courses':>7} {'requests':>8} {'wall ms':>9}")
+    try:
+        for workers in args.workers:
+            client = TimetableClient(server.url, max_workers=workers)
+            wall = 0.0
+            records = []
+            for i in range(args.repeat):
+                start = time.perf_counter()
+                records = client.fetch_all(DIVISIONS, FIXTURE_SESSIONS)
+                wall += time.perf_counter() - start
+            client.close()
+            print(f"{workers:>7} {len(records):>7} {client.requests:>8} {wall / args.repeat * 1000:>9.2f}")
+            if records != expected:
+                print(f"{workers} workers: MISMATCH between HTTP records and the saved result pages")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Course lookups through ttb_index against a linear scan of the course list.
+
+Writes a synthetic term (benchmarks.bench_packing.synthetic_courses) as
+course_data.json and as an index file, then reports the startup time of each
+way of querying it (json.load for the scan, json.load plus the index build for
+CourseIndex, the memory map for MappedIndex) and the mean latency of a few
+typical queries, each returning its first page of 20, checking that all three
+find the same courses.
+
+Run from the repository root:
+    python -m benchmarks.bench_index                     # 8000 courses, about a full term
+    python -m benchmarks.bench_index --courses 20000 --repeat 50
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+from ttb_index import FIELDS, CourseIndex, MappedIndex, write_index
+from benchmarks.bench_packing import synthetic_courses
+
+PAGE = 20
+
+
+def scan(courses, prefix=None, **filters):
+    """What a consumer of course_data.json does today: test every course."""
+    prefix = prefix.casefold() if prefix is not None else None
+    wanted = {field: {value.casefold() for value in ([values] if isinstance(values, str) else values)}
+              for field, values in filters.items()}
+    matches = []
+    for course in courses:
+        if prefix is not None and not course["code_title"].casefold().startswith(prefix):
+            continue
+        if all(wanted[field] & {value.casefold() for value in FIELDS[field](course)} for field in wanted):
+            matches.append(course)
+    return len(matches), matches[:PAGE]
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=8000, help="courses in the term (default: 8000)")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per query (default: 20)")
+    parser.add_argument("--seed", type=int, default=0, help="dataset seed (default: 0)")
+    args = parser.parse_args()
+
+    courses = synthetic_courses(args.courses, args.seed)
+    middle = courses[len(courses) // 2]
+    queries = {
+        "code": {"code": middle["code_title"].split(" - ")[0]},
+        "prefix": {"prefix": middle["code_title"][:6]},
+        "instructor": {"instructor": middle["sections"][0]["instructor"]},
+        "campus+session": {"campus": middle["campus"], "session": middle["session"]},
+        "combined": {"prefix": middle["code_title"][:5], "campus": middle["campus"],
+                     "delivery_mode": ["Hybrid", "In Person"]},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        data_path = os.path.join(directory, "course_data.json")
+        index_path = os.path.join(directory, "course_data.idx")
+        with open(data_path, "w") as f:
+            json.dump(courses, f, indent=4)
+        write_index(courses, index_path)
+        del courses
+
+        def load():
+            with open(data_path) as f:
+                return json.load(f)
+
+        loaded, load_seconds = timed(load, 3)
+        index, build_seconds = timed(lambda: CourseIndex(loaded), 3)
+        start = time.perf_counter()
+        mapped = MappedIndex(index_path)
+        map_seconds = time.perf_counter() - start
+        print(f"{len(loaded)} courses; course_data.json {os.path.getsize(data_path) / 2 ** 20:.1f} MiB, "
+              f"index file {os.path.getsize(index_path) / 2 ** 20:.1f} MiB")
+        print(f"startup ms: scan {load_seconds * 1000:.1f}, CourseIndex {(load_seconds + build_seconds) * 1000:.1f}, "
+              f"MappedIndex {map_seconds * 1000:.2f}")
+        print()
+        print(f"{'query':<15} {'matches':>7} {'scan us':>10} {'index us':>10} {'mapped us':>10}")
+        for name, query in queries.items():
+            (total, page), scan_seconds = timed(lambda: scan(loaded, **query), args.repeat)
+            indexed, index_seconds = timed(lambda: index.query(0, PAGE, **query), args.repeat)
+            from_map, mapped_seconds = timed(lambda: mapped.query(0, PAGE, **query), args.repeat)
+            print(f"{name:<15} {total:>7} {scan_seconds * 1e6:>10.1f} {index_seconds * 1e6:>10.1f} "
+                  f"{mapped_seconds * 1e6:>10.1f}")
+            if not (indexed == from_map == (total, page)):
+                print(f"MISMATCH for {name}")
+        mapped.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compare peak Python memory and output size for the ways of saving the courses:
+  json      - collect every course, then json.dump(indent=4) (the legacy output)
+  ndjson    - append each page's courses to an NDJSON file as it completes
+  ndjson.gz - the same, gzip-compressed
+Pages are generated one at a time, so the streaming paths never hold the dataset.
+
+Run from the repository root:
+    python -m benchmarks.bench_output
+    python -m benchmarks.bench_output --courses 50000
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from ttb_output import CourseWriter, iter_courses, write_legacy_json
+from benchmarks.bench_packing import synthetic_courses
+
+PAGE_SIZE = 20
+
+
+def pages(count):
+    for start in range(0, count, PAGE_SIZE):
+        yield synthetic_courses(min(PAGE_SIZE, count - start), seed=start)
+
+
+def save_json(path, count):
+    all_course_data = []
+    for page in pages(count):
+        all_course_data.extend(page)
+    with open(path, "w") as f:
+        json.dump(all_course_data, f, indent=4)
+
+
+def save_ndjson(path, count):
+    writer = CourseWriter(path)
+    for page in pages(count):
+        writer.write(page)
+    writer.close()
+
+
+def measure(name, func, path, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(path, count)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{name:<10} {elapsed * 1000:>9.1f} {peak / 2 ** 20:>9.1f} {os.path.getsize(path) / 2 ** 20:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=10000, help="synthetic courses (default: 10000)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'output':<10} {'ms':>9} {'peak MiB':>9} {'size MiB':>9}")
+        legacy = os.path.join(directory, "course_data.json")
+        measure("json", save_json, legacy, args.courses)
+        for extension in ("ndjson", "ndjson.gz"):
+            path = os.path.join(directory, f"course_data.{extension}")
+            measure(extension, save_ndjson, path, args.courses)
+        converted = os.path.join(directory, "converted.json")
+        write_legacy_json(iter_courses(path), converted)
+        with open(legacy) as a, open(converted) as b:
+            if a.read() != b.read():
+                print("MISMATCH between course_data.json and the converted NDJSON output")
+
+
+if __name__ == "__main__":
+    main()
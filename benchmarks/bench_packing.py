@@ -0,0 +1,91 @@
+"""
+Compare the Firestore chunk packers on a synthetic dataset:
+  legacy    - re-serialize the growing chunk with json.dumps(indent=4) per course
+  streaming - size each course once and keep a running total (ttb_firestore.pack_chunks)
+
+Reports packing time, chunk count, and the largest and mean chunk size as
+Firestore counts it against the 1 MiB document limit.
+
+Run from the repository root:
+    python -m benchmarks.bench_packing                   # 10k courses (legacy takes minutes)
+    python -m benchmarks.bench_packing --courses 2000 --skip-legacy
+"""
+import json
+import time
+import random
+import argparse
+from ttb_firestore import DOCUMENT_OVERHEAD, MAX_SIZE, firestore_size, pack_chunks
+
+CAMPUSES = ["St. George", "Mississauga", "Scarborough"]
+SESSIONS = ["2025 Fall (F)", "2026 Winter (S)", "2025 Fall - 2026 Winter (Y)"]
+MODES = ["In Person", "Online - Synchronous", "Online - Asynchronous", "Hybrid"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+
+
+def synthetic_courses(count, seed=0):
+    """Courses shaped like the scraper's records, with realistic field lengths."""
+    rng = random.Random(seed)
+    courses = []
+    for i in range(count):
+        sections = []
+        for s in range(rng.randint(1, 8)):
+            start = rng.randint(9, 19)
+            sections.append({
+                "code": f"{rng.choice(['LEC', 'TUT', 'PRA'])}{s + 1:02d}01",
+                "day_time": "".join(f"{rng.choice(DAYS)}{start}:00 - {start + rng.randint(1, 3)}:00"
+                                    for m in range(rng.randint(1, 3))),
+                "location": rng.choice(["BA 1130", "SW 319", "IB 110", "TBA"]),
+                "instructor": rng.choice(["Liu, J.", "Patel, R.", "—"]),
+                "availability": f"{rng.randint(0, 80)} of 80",
+                "waitlist": f"{rng.randint(0, 40)} students",
+                "enrollment_control": rng.choice(["N/A", "Enrolment Controls exist for this section.See details"]),
+                "delivery_mode": rng.choice(MODES),
+            })
+        courses.append({
+            "code_title": f"CSC{i:04d}H1 - Introduction to Topic {i}",
+            "campus": rng.choice(CAMPUSES),
+            "session": rng.choice(SESSIONS),
+            "notes": "Priority is given to students enrolled in a Specialist program. " * rng.randint(0, 3) or "N/A",
+            "sections": sections,
+        })
+    return courses
+
+
+def legacy_chunks(courses, max_size=MAX_SIZE):
+    """The original packer from the scraper scripts."""
+    chunk = []
+    for course in courses:
+        temp_chunk = chunk + [course]
+        if len(json.dumps(temp_chunk, indent=4).encode("utf-8")) > max_size:
+            yield chunk
+            chunk = [course]
+        else:
+            chunk = temp_chunk
+    if chunk:
+        yield chunk
+
+
+def report(name, packer, courses):
+    start = time.perf_counter()
+    chunks = list(packer(courses))
+    elapsed = time.perf_counter() - start
+    sizes = [DOCUMENT_OVERHEAD + firestore_size(chunk) for chunk in chunks]
+    print(f"{name:<10} {elapsed * 1000:>10.1f} {len(chunks):>7} {max(sizes):>10} {sum(sizes) / len(sizes):>10.0f}"
+          f" {'OVER' if max(sizes) > MAX_SIZE else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=10000, help="synthetic courses (default: 10000)")
+    parser.add_argument("--skip-legacy", action="store_true", help="only time the streaming packer")
+    args = parser.parse_args()
+
+    courses = synthetic_courses(args.courses)
+    print(f"{'packer':<10} {'ms':>10} {'chunks':>7} {'max bytes':>10} {'mean bytes':>10}")
+    if not args.skip_legacy:
+        report("legacy", legacy_chunks, courses)
+    report("streaming", pack_chunks, courses)
+
+
+if __name__ == "__main__":
+    main()
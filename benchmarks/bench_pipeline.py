@@ -0,0 +1,90 @@
+"""
+Compare uploading after scraping with the pipelined upload (--pipeline), using
+simulated scrape workers and the in-memory Firestore stand-in:
+  sequential - scrape every page, then upload the chunks
+  pipelined  - stream pages in page order into the packer while scraping, and
+               commit each chunk in the background as soon as it is packed
+
+Reports end-to-end wall time for both, next to the scrape-only and upload-only
+times, and how long the pipelined upload trails the last scraped page (about the
+last chunk's commit and the manifest's, since every chunk is committed as soon
+as it is packed). Checks that both leave the same courses in the collection.
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --page-ms 200 --latency 500 --threads 5
+"""
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from ttb_firestore import MANIFEST_COLLECTION, BackgroundUpload, sync_chunks
+from ttb_navigation import PageScheduler
+from benchmarks.bench_packing import synthetic_courses
+from benchmarks.bench_sync import PREFIX, stored_courses
+from benchmarks.memory_firestore import MemoryFirestore
+
+PAGE_SIZE = 20
+
+
+def scrape(scheduler, pages, threads, page_seconds):
+    """Simulated workers: each page takes page_seconds to "scrape"."""
+    scheduler.populate(len(pages))
+
+    def worker():
+        while True:
+            page = scheduler.next_page()
+            if page is None:
+                return
+            time.sleep(page_seconds)
+            scheduler.complete(page, pages[page - 1])
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(worker) for i in range(threads)]
+        for future in futures:
+            future.result()
+    scheduler.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=5000, help="synthetic courses (default: 5000)")
+    parser.add_argument("--threads", type=int, default=5, help="simulated scrape workers (default: 5)")
+    parser.add_argument("--page-ms", type=float, default=40, help="simulated scrape time per page in ms")
+    parser.add_argument("--latency", type=float, default=400, help="simulated latency per Firestore call in ms")
+    args = parser.parse_args()
+
+    courses = synthetic_courses(args.courses)
+    pages = [courses[i:i + PAGE_SIZE] for i in range(0, len(courses), PAGE_SIZE)]
+
+    def upload(db, stream, eager=False):
+        return sync_chunks(db, db.collection("courses"),
+                           db.collection(MANIFEST_COLLECTION).document(f"{PREFIX}manifest"),
+                           PREFIX, stream, 4, eager=eager)
+
+    start = time.perf_counter()
+    scheduler = PageScheduler()
+    scrape(scheduler, pages, args.threads, args.page_ms / 1000)
+    scrape_seconds = time.perf_counter() - start
+    db = MemoryFirestore(args.latency / 1000)
+    upload(db, scheduler.ordered_results())
+    sequential = time.perf_counter() - start
+    print(f"scrape only  {scrape_seconds * 1000:>9.1f} ms")
+    print(f"upload only  {(sequential - scrape_seconds) * 1000:>9.1f} ms")
+    print(f"sequential   {sequential * 1000:>9.1f} ms")
+
+    start = time.perf_counter()
+    scheduler = PageScheduler()
+    pipelined_db = MemoryFirestore(args.latency / 1000)
+    uploader = BackgroundUpload(upload, pipelined_db, scheduler.open_stream(), True)
+    scrape(scheduler, pages, args.threads, args.page_ms / 1000)
+    scraped = time.perf_counter()
+    uploader.result()
+    print(f"pipelined    {(time.perf_counter() - start) * 1000:>9.1f} ms "
+          f"(upload done {(time.perf_counter() - scraped) * 1000:.1f} ms after the last page)")
+
+    if stored_courses(pipelined_db) != stored_courses(db):
+        print("MISMATCH between sequential and pipelined uploads")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+An availability poll (ttb_poll) against a full HTTP fetch of the same term.
+
+Builds a term of --pages results pages from the recorded API courses in
+benchmarks/fixtures/api (renamed and with shuffled enrolment), serves it with
+the replay server, and times:
+  full  - what --fetch http does before uploading: fetch every course (20 per
+          page, as the site asks), convert it, write course_data.json and pack
+          the Firestore chunks
+  poll  - what --poll does with its defaults (ttb_poll.POLL_PAGE_SIZE courses
+          requested per page): one poll against that course_data.json, one
+          against its own state, and one against a backend that serves only
+          --cap courses per page, after changing the enrolment of --changed
+          sections on the server before each
+checking that each poll reports exactly the sections that changed. The latency
+is per response; larger pages also carry more JSON, which is served for real.
+
+Run from the repository root:
+    python -m benchmarks.bench_poll                      # 100 pages
+    python -m benchmarks.bench_poll --pages 300 --latency 100 --workers 8 --cap 20
+"""
+import os
+import glob
+import json
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+from ttb_http import (
+    COURSES_ENDPOINT, DIVISIONS, PAGE_SIZE, TimetableClient, recording_key, search_body, term_sessions
+)
+from ttb_firestore import pack_chunks
+from ttb_output import write_legacy_json
+from ttb_poll import POLL_PAGE_SIZE, AvailabilityPoller
+from ttb_terms import TERMS
+from benchmarks.replay_server import ReplayServer
+
+RECORDED = os.path.join(os.path.dirname(__file__), "fixtures", "api", "*.json")
+
+TERM = TERMS["fall_winter"]
+
+
+def recorded_courses():
+    courses = []
+    for path in sorted(glob.glob(RECORDED)):
+        with open(path, encoding="utf-8") as f:
+            courses.extend(json.load(f)["payload"]["pageableCourse"]["courses"])
+    return courses
+
+
+def synthetic_term(pages, seed=0):
+    """API courses for a term of pages results pages, cycling through the recorded ones."""
+    rng = random.Random(seed)
+    recorded = recorded_courses()
+    courses = []
+    for i in range(pages * PAGE_SIZE):
+        course = json.loads(json.dumps(recorded[i % len(recorded)]))
+        course["code"] = f"{course['code'][:3]}{i:04d}{course['code'][-2:]}"
+        for section in course["sections"]:
+            section["currentEnrolment"] = rng.randint(0, section["maxEnrolment"] or 0)
+            section["currentWaitlist"] = rng.randint(0, 20)
+        courses.append(course)
+    return courses
+
+
+def write_recordings(courses, directory, page_size=PAGE_SIZE, requested=None):
+    """
+    Record the term at page_size courses per page. With requested, a request for
+    requested courses per page is answered with the first page at page_size,
+    as by a backend that caps the page size.
+    """
+    sessions = term_sessions(TERM.name)
+    for page in range(1, max(1, -(-len(courses) // page_size)) + 1):
+        payload = {"payload": {"pageableCourse": {
+            "total": len(courses), "page": page, "pageSize": page_size,
+            "courses": courses[(page - 1) * page_size:page * page_size]}}}
+        bodies = [search_body(DIVISIONS, sessions, page, page_size)]
+        if requested is not None and page == 1:
+            bodies.append(search_body(DIVISIONS, sessions, page, requested))
+        for body in bodies:
+            with open(os.path.join(directory, recording_key(COURSES_ENDPOINT, body)), "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+
+
+def enrol(courses, count, rng):
+    """Enrol one more student in count random sections; returns how many sections changed."""
+    sections = [section for course in courses for section in course["sections"]]
+    for section in rng.sample(sections, min(count, len(sections))):
+        section["currentEnrolment"] = (section["currentEnrolment"] or 0) + 1
+    return min(count, len(sections))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=100, help="results pages in the term (default: 100)")
+    parser.add_argument("--workers", type=int, default=5, help="concurrent requests (default: 5)")
+    parser.add_argument("--latency", type=float, default=50, help="server latency per response in ms")
+    parser.add_argument("--changed", type=int, default=200, help="sections changed between polls")
+    parser.add_argument("--page-size", type=int, default=POLL_PAGE_SIZE,
+                        help=f"courses requested per page by the polls (default: {POLL_PAGE_SIZE}, as --poll)")
+    parser.add_argument("--cap", type=int, default=100,
+                        help="courses per page served by the capped backend of the last poll (default: 100)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    courses = synthetic_term(args.pages, args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        recordings = os.path.join(directory, "recordings")
+        os.makedirs(recordings)
+        write_recordings(courses, recordings)
+        server = ReplayServer(recordings, latency=args.latency / 1000).start()
+        course_data = os.path.join(directory, f"{TERM.prefix}course_data.json")
+        try:
+            client = TimetableClient(server.url, max_workers=args.workers)
+            start = time.perf_counter()
+            records = client.fetch_all(DIVISIONS, term_sessions(TERM.name))
+            write_legacy_json(records, course_data)
+            chunks = sum(1 for chunk in pack_chunks(records))
+            full = time.perf_counter() - start
+            client.close()
+            sections = sum(len(record["sections"]) for record in records)
+            print(f"{len(records)} courses, {sections} sections, {chunks} chunks, "
+                  f"{args.latency:.0f} ms latency, {args.workers} workers")
+            print(f"{'run':<32} {'seconds':>8} {'of full':>8} {'changed':>8}")
+            print(f"{'full (20/page)':<32} {full:>8.2f} {'100%':>8} {'':>8}")
+
+            state = os.path.join(directory, "availability.json")
+            deltas = os.path.join(directory, "availability.ndjson")
+            for source, cap in [("course data", None), ("last poll", None), ("last poll", args.cap)]:
+                # Date the state after course_data.json, as a real poll would be.
+                with contextlib.suppress(FileNotFoundError):
+                    os.utime(state, (time.time() + 1, time.time() + 1))
+                expected = enrol(courses, args.changed, rng)
+                if cap is None:
+                    write_recordings(courses, recordings, args.page_size)
+                else:
+                    write_recordings(courses, recordings, cap, requested=args.page_size)
+                poller = AvailabilityPoller(TERM, course_data, server.url, args.workers, state, deltas,
+                                            args.page_size)
+                start = time.perf_counter()
+                delta = poller.poll()
+                seconds = time.perf_counter() - start
+                poller.close()
+                name = f"poll ({source}, {poller.client.page_size}/page)"
+                print(f"{name:<32} {seconds:>8.2f} {seconds / full:>8.0%} {len(delta['changed']):>8}")
+                if len(delta["changed"]) != expected or delta["added"] or delta["removed"]:
+                    print(f"MISMATCH: expected {expected} changed sections, got {len(delta['changed'])} "
+                          f"changed, {len(delta['added'])} added, {len(delta['removed'])} removed")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
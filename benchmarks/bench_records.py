@@ -0,0 +1,114 @@
+"""
+Memory of a full term's courses held as dicts versus compact records (ttb_records).
+
+Writes a synthetic term (benchmarks.bench_packing.synthetic_courses) to an NDJSON
+file, then, for each representation, loads it in a fresh interpreter one course
+at a time, the way pages accumulate during a scrape (every string a separate
+object, as the parser makes them). Reports the peak RSS of that process, the
+memory the courses hold by tracemalloc, and the time to build and serialize
+them, and checks that both serialize to the same legacy course_data.json bytes.
+
+Run from the repository root:
+    python -m benchmarks.bench_records                   # 8000 courses, about a full term
+    python -m benchmarks.bench_records --courses 20000
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import resource
+import tempfile
+import subprocess
+import tracemalloc
+from ttb_records import compact_course, plain
+from benchmarks.bench_packing import synthetic_courses
+
+
+def peak_rss():
+    """
+    Peak RSS of this process in bytes. On Linux from VmHWM: ru_maxrss survives
+    exec, so a child would start at its parent's peak.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def load(path, representation, trace):
+    """Measure one representation in this process and print the results as JSON."""
+    convert = compact_course if representation == "compact" else (lambda course: course)
+    if trace:
+        tracemalloc.start()
+    baseline = peak_rss()
+    start = time.perf_counter()
+    courses = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            courses.append(convert(json.loads(line)))
+    build = time.perf_counter() - start
+    held = tracemalloc.get_traced_memory()[0] if trace else None
+    peak = peak_rss()
+    start = time.perf_counter()
+    encoded = json.dumps(courses, indent=4, default=plain).encode("utf-8")
+    serialize = time.perf_counter() - start
+    print(json.dumps({
+        "baseline": baseline, "peak": peak, "held": held, "build": build, "serialize": serialize,
+        "sha256": hashlib.sha256(encoded).hexdigest(),
+    }))
+
+
+def measure(path, representation, trace):
+    output = subprocess.run([sys.executable, "-m", "benchmarks.bench_records", "--child", representation,
+                             "--source", path] + (["--trace"] if trace else []),
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=8000, help="courses in the term (default: 8000)")
+    parser.add_argument("--seed", type=int, default=0, help="dataset seed (default: 0)")
+    parser.add_argument("--no-trace", action="store_true", help="skip the tracemalloc run (RSS only)")
+    parser.add_argument("--child", choices=["dict", "compact"], help=argparse.SUPPRESS)
+    parser.add_argument("--source", help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        load(args.source, args.child, args.trace)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "courses.ndjson")
+        courses = synthetic_courses(args.courses, args.seed)
+        sections = sum(len(course["sections"]) for course in courses)
+        with open(path, "w", encoding="utf-8") as f:
+            for course in courses:
+                f.write(json.dumps(course) + "\n")
+        del courses
+        print(f"{args.courses} courses, {sections} sections")
+        print(f"{'records':<8} {'peak MiB':>9} {'growth MiB':>11} {'held MiB':>9} {'build s':>8} {'dump s':>7}")
+        digests = set()
+        for representation in ["dict", "compact"]:
+            # Peak RSS from an untraced run: tracemalloc's own bookkeeping would inflate it.
+            result = measure(path, representation, trace=False)
+            held = "-"
+            if not args.no_trace:
+                held = f"{measure(path, representation, trace=True)['held'] / 2 ** 20:.1f}"
+            digests.add(result["sha256"])
+            print(f"{representation:<8} {result['peak'] / 2 ** 20:>9.1f} "
+                  f"{(result['peak'] - result['baseline']) / 2 ** 20:>11.1f} {held:>9} "
+                  f"{result['build']:>8.2f} {result['serialize']:>7.2f}")
+        if len(digests) != 1:
+            print("MISMATCH: the representations serialize to different JSON")
+
+
+if __name__ == "__main__":
+    main()
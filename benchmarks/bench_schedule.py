@@ -0,0 +1,84 @@
+"""
+Schedule generation: the bitset search in ttb_schedule against the naive approach
+of trying every combination of sections and comparing each pair by re-parsing
+their day_time text.
+
+For random sets of course codes from a synthetic term, reports how many
+conflict-free schedules each finds (they must agree) and how long each takes.
+
+Run from the repository root:
+    python -m benchmarks.bench_schedule                  # 20 sets of 4 courses
+    python -m benchmarks.bench_schedule --courses 5 --sets 10
+"""
+import time
+import random
+import argparse
+import itertools
+from ttb_schedule import course_code, generate_schedules, parse_meetings, section_kind, session_halves
+from benchmarks.bench_packing import synthetic_courses
+
+
+def clash(first, second):
+    """Pairwise check on the display text, the way schedule builders compare sections."""
+    (course_a, section_a), (course_b, section_b) = first, second
+    if not session_halves(course_a["session"]) & session_halves(course_b["session"]):
+        return False
+    for day_a, start_a, end_a in parse_meetings(section_a["day_time"]):
+        for day_b, start_b, end_b in parse_meetings(section_b["day_time"]):
+            if day_a == day_b and start_a < end_b and start_b < end_a:
+                return True
+    return False
+
+
+def naive_schedules(courses, codes):
+    choices = []
+    for code in codes:
+        options = []
+        for course in courses:
+            if course_code(course) != code:
+                continue
+            kinds = {}
+            for section in course["sections"]:
+                kinds.setdefault(section_kind(section), []).append((course, section))
+            options.extend(itertools.product(*kinds.values()))
+        choices.append(options)
+    count = 0
+    for combination in itertools.product(*choices):
+        picks = [pick for part in combination for pick in part]
+        if not any(clash(a, b) for a, b in itertools.combinations(picks, 2)):
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=4, help="courses per schedule (default: 4)")
+    parser.add_argument("--sets", type=int, default=20, help="random course sets (default: 20)")
+    parser.add_argument("--term", type=int, default=2000, help="courses in the synthetic term (default: 2000)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    args = parser.parse_args()
+
+    courses = synthetic_courses(args.term, args.seed)
+    rng = random.Random(args.seed)
+    codes = [course_code(course) for course in courses]
+    naive_total = bitset_total = 0.0
+    schedules = 0
+    for _ in range(args.sets):
+        chosen = rng.sample(codes, args.courses)
+        start = time.perf_counter()
+        expected = naive_schedules(courses, chosen)
+        naive_total += time.perf_counter() - start
+        start = time.perf_counter()
+        found = sum(1 for schedule in generate_schedules(courses, chosen))
+        bitset_total += time.perf_counter() - start
+        schedules += found
+        if found != expected:
+            print(f"MISMATCH for {chosen}: bitset {found}, naive {expected}")
+    print(f"{args.sets} sets of {args.courses} courses, {schedules} conflict-free schedules")
+    print(f"{'method':<8} {'total s':>8} {'ms/set':>8}")
+    for name, total in [("naive", naive_total), ("bitset", bitset_total)]:
+        print(f"{name:<8} {total:>8.3f} {total / args.sets * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
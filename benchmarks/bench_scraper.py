@@ -0,0 +1,143 @@
+"""
+End-to-end scraper throughput on the local mock timetable (benchmarks.mock_ttb),
+without touching the live site.
+
+For each worker count, runs the scraper's own queue-mode flow (process_pages
+pulling from a PageScheduler, with a warm driver pool) against the mock, and
+reports pages/s, CPU seconds (this process, chromedriver and Chrome) and the
+peak RSS of the whole process tree, checking the scraped courses against what
+the mock served. Also times the BeautifulSoup parse alone on the saved HTML
+fixtures, which needs no browser.
+
+Run from the repository root:
+    python -m benchmarks.bench_scraper                              # needs Chrome
+    python -m benchmarks.bench_scraper --pages 30 --workers 1,2,4,8 --latency 80
+    python -m benchmarks.bench_scraper --parse-only
+"""
+import io
+import os
+import glob
+import time
+import resource
+import argparse
+import warnings
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+import scraper
+from course_parser import parse_courses_html
+from ttb_driver import DriverPool, process_tree_rss
+from ttb_navigation import NavigationStats, PageScheduler
+from ttb_search import SearchLinks
+from ttb_terms import TERMS
+from benchmarks.bench_extraction import FIXTURES, measure
+from benchmarks.mock_ttb import MockTimetable
+
+# A term with the session filter unset, so a search selects divisions only.
+TERM = TERMS["fall_winter"]
+
+
+class PeakRss:
+    """Samples the RSS of this process and its descendants in the background."""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.peak = max(self.peak, process_tree_rss(os.getpid()) or 0)
+            self.stopped.wait(self.interval)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        return self.peak
+
+
+def cpu_seconds():
+    """CPU time of this process and of its children that have exited (browsers once quit)."""
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def run(site, workers, verbose):
+    """Scrape the mock with workers browsers; return (courses, pages, seconds, cpu, peak RSS)."""
+    scraper.POOL = DriverPool()
+    scheduler = PageScheduler()
+    stats = NavigationStats()
+    sampler = PeakRss().start()
+    cpu_start = cpu_seconds()
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    try:
+        with output:
+            scraper.POOL.prewarm(workers)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(scraper.process_pages, TERM, i, workers, scheduler, stats)
+                           for i in range(workers)]
+                for future in futures:
+                    future.result()
+            scheduler.close()
+            elapsed = time.perf_counter() - start
+    finally:
+        scraper.POOL.close()
+    peak = sampler.stop()
+    return scheduler.ordered_results(), stats.pages, elapsed, cpu_seconds() - cpu_start, peak
+
+
+def parse_only(repeat):
+    print(f"{'fixture':<22} {'courses':>7} {'wall ms':>9} {'cpu ms':>9} {'MB/s':>7}")
+    for path in sorted(glob.glob(FIXTURES)):
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        courses, wall, cpu = measure(lambda: parse_courses_html(html), repeat)
+        throughput = len(html.encode("utf-8")) / 2 ** 20 / (wall / 1000)
+        print(f"{os.path.basename(path):<22} {len(courses):>7} {wall:>9.2f} {cpu:>9.2f} {throughput:>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10, help="results pages on the mock (default: 10)")
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts (default: 1,2,4)")
+    parser.add_argument("--latency", type=float, default=50, help="mock API latency per response in ms")
+    parser.add_argument("--expand-ms", type=int, default=20, help="mock accordion render delay in ms")
+    parser.add_argument("--extract", choices=["soup", "script"], default="soup", help="extraction mode")
+    parser.add_argument("--expand", choices=["click", "bulk"], default="click", help="accordion expansion")
+    parser.add_argument("--filters", choices=["click", "bulk"], default="click", help="filter setup")
+    parser.add_argument("--repeat", type=int, default=20, help="parse runs per fixture (default: 20)")
+    parser.add_argument("--parse-only", action="store_true", help="only time the parse on the fixtures")
+    parser.add_argument("--verbose", action="store_true", help="keep the scraper's own output")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", FutureWarning)  # soupsieve's :contains deprecation
+
+    parse_only(args.repeat)
+    if args.parse_only:
+        return
+
+    site = MockTimetable(args.pages, latency=args.latency / 1000, expand_ms=args.expand_ms).start()
+    scraper.URL = site.url
+    scraper.LINKS = SearchLinks(site.url)
+    scraper.EXTRACTION = args.extract
+    scraper.EXPANSION = args.expand
+    scraper.FILTERS = args.filters
+    print()
+    print(f"{'workers':>7} {'pages':>6} {'seconds':>8} {'pages/s':>8} {'cpu s':>7} {'peak MiB':>9}")
+    for workers in [int(count) for count in args.workers.split(",")]:
+        courses, pages, elapsed, cpu, peak = run(site, workers, args.verbose)
+        print(f"{workers:>7} {pages:>6} {elapsed:>8.2f} {pages / elapsed:>8.2f} {cpu:>7.1f} "
+              f"{peak / 2 ** 20:>9.0f}")
+        if courses != site.courses:
+            print(f"MISMATCH: scraped {len(courses)} courses, the mock served {len(site.courses)}")
+    site.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compare the two Firestore upload modes on the in-memory stand-in:
+  replace - delete this program's documents, then rewrite every chunk
+  sync    - write only chunks whose hash changed, delete only orphaned chunks
+
+Simulates a first upload, a weekly run in which a few sections changed, a run
+with one course added in the middle of the term, one with a course removed and
+one that lost half the courses. Reports document reads, writes (the manifest's
+included), deletes, chunk documents written, RPCs, upload time and documents
+written or deleted per second for each mode. Every run is checked to leave the
+same courses in the collection. Sync writes one chunk per chunk holding a change:
+an added or removed course should cost about one chunk, and --changes scattered
+sections about --changes chunks.
+
+Run from the repository root:
+    python -m benchmarks.bench_sync
+    python -m benchmarks.bench_sync --courses 10000 --changes 2 --latency 80
+    python -m benchmarks.bench_sync --latency 80 --workers 1
+"""
+import time
+import random
+import argparse
+import ttb_firestore
+from ttb_firestore import MANIFEST_COLLECTION, replace_chunks, sync_chunks
+from benchmarks.bench_packing import synthetic_courses
+from benchmarks.memory_firestore import MemoryFirestore
+
+PREFIX = "bench_"
+
+
+def stored_courses(db):
+    """The courses left in the collection, in the manifest's chunk order."""
+    return ttb_firestore.stored_courses(db.collection("courses"),
+                                        db.collection(MANIFEST_COLLECTION).document(f"{PREFIX}manifest"))
+
+
+def weekly_changes(courses, changes, seed=1):
+    """Copy of courses with the availability of a few random sections changed."""
+    rng = random.Random(seed)
+    courses = [dict(course, sections=[dict(section) for section in course["sections"]]) for course in courses]
+    for i in range(changes):
+        section = rng.choice(rng.choice(courses)["sections"])
+        section["availability"] = f"{rng.randint(0, 80)} of 80"
+    return courses
+
+
+def run(name, upload, db, courses, workers):
+    collection_ref = db.collection("courses")
+    manifest_ref = db.collection(MANIFEST_COLLECTION).document(f"{PREFIX}manifest")
+    db.reset_counts()
+    start = time.perf_counter()
+    stats = upload(db, collection_ref, manifest_ref, PREFIX, courses, workers)
+    elapsed = time.perf_counter() - start
+    per_second = (stats.written + stats.deleted) / elapsed
+    print(f"{name:<16} {db.reads:>6} {db.writes:>7} {db.deletes:>8} {stats.written:>7} {stats.unchanged:>10}"
+          f" {db.rpcs:>5} {elapsed * 1000:>9.1f} {per_second:>7.1f}")
+    if stored_courses(db) != courses:
+        print(f"{name}: MISMATCH between uploaded and stored courses")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=5000, help="synthetic courses (default: 5000)")
+    parser.add_argument("--changes", type=int, default=10,
+                        help="sections whose availability changes between runs (default: 10)")
+    parser.add_argument("--latency", type=float, default=0, help="simulated latency per Firestore call in ms")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent batch commits (default: 4)")
+    args = parser.parse_args()
+
+    first = synthetic_courses(args.courses)
+    second = weekly_changes(first, args.changes)
+    middle = len(second) // 2
+    added = synthetic_courses(args.courses + 1, seed=1)[-1]
+    inserted = second[:middle] + [dict(added, code_title=f"ADD{added['code_title']}")] + second[middle:]
+    print(f"{'run':<16} {'reads':>6} {'writes':>7} {'deletes':>8} {'chunks':>7} {'unchanged':>10} {'rpcs':>5}"
+          f" {'ms':>9} {'docs/s':>7}")
+    for name, upload in (("replace", replace_chunks), ("sync", sync_chunks)):
+        db = MemoryFirestore(args.latency / 1000)
+        run(f"{name} first", upload, db, first, args.workers)
+        run(f"{name} weekly", upload, db, second, args.workers)
+        run(f"{name} insert", upload, db, inserted, args.workers)
+        run(f"{name} remove", upload, db, second[:middle // 2] + second[middle // 2 + 1:], args.workers)
+        run(f"{name} shrink", upload, db, second[:middle], args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Local static site serving the saved results pages with the kind of weight the
+live timetable pulls in: images, a web font, and an analytics script. Counts
+the requests it serves per resource type, so a browser run against it shows
+what a launch profile actually fetched.
+
+Run from the repository root:
+    python -m benchmarks.fixture_site                 # http://127.0.0.1:8766/page/1
+    python -m benchmarks.fixture_site --latency 50    # add 50ms per response
+"""
+import os
+import time
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+IMAGES = 12
+ASSET_BYTES = 64 * 1024
+
+HEAD = """<link rel="stylesheet" href="/static/fonts.css">
+<script async src="/gtag/js?id=G-BENCH"></script>
+"""
+FONT_CSS = b"""@font-face { font-family: Bench; src: url(/static/bench.woff2) format("woff2"); }
+body { font-family: Bench, sans-serif; }
+"""
+ASSETS = {
+    "/static/fonts.css": ("text/css", "stylesheet", FONT_CSS),
+    "/static/bench.woff2": ("font/woff2", "font", bytes(ASSET_BYTES)),
+    "/gtag/js": ("application/javascript", "analytics", b"window.dataLayer = [];\n" + b" " * ASSET_BYTES),
+}
+
+
+def page_html(page):
+    """A fixture results page with the heavy assets injected."""
+    with open(os.path.join(FIXTURES, f"results_page_{page}.html"), encoding="utf-8") as f:
+        html = f.read()
+    images = "".join(f'<img src="/static/banner_{i}.png" width="1" height="1">' for i in range(IMAGES))
+    html = html.replace("</head>", HEAD + "</head>", 1) if "</head>" in html else HEAD + html
+    return html.replace("</body>", images + "</body>", 1) if "</body>" in html else html + images
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path.startswith("/page/"):
+            try:
+                payload = page_html(int(path.rsplit("/", 1)[1])).encode("utf-8")
+            except (ValueError, OSError):
+                self.send_error(404)
+                return
+            content_type, kind = "text/html; charset=utf-8", "document"
+        elif path.startswith("/static/banner_"):
+            content_type, kind, payload = "image/png", "image", bytes(ASSET_BYTES)
+        elif path in ASSETS:
+            content_type, kind, payload = ASSETS[path]
+        else:
+            self.send_error(404)
+            return
+        self.server.count(kind, len(payload))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureSite(ThreadingHTTPServer):
+    """Threaded server for the fixture site, counting requests and bytes per resource type."""
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        super().__init__((host, port), FixtureHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.bytes = Counter()
+
+    def count(self, kind, size):
+        with self.lock:
+            self.requests[kind] += 1
+            self.bytes[kind] += size
+
+    def reset_counts(self):
+        with self.lock:
+            self.requests.clear()
+            self.bytes.clear()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        """Serve in a background thread and return the server."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766, help="port to listen on (default: 8766)")
+    parser.add_argument("--latency", type=float, default=0, help="added latency per response in ms")
+    args = parser.parse_args()
+
+    server = FixtureSite(port=args.port, latency=args.latency / 1000)
+    print(f"Serving the fixture pages on {server.url}page/1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+In-memory stand-in for the parts of the Firestore client the upload uses
+(collection, document, get, set, delete, stream, batch, and document-id range
+queries), counting every call so uploads can be compared and checked without a
+Firebase project. latency adds a fixed delay per RPC to stand in for the round
+trip; concurrent RPCs overlap like they would against the real service.
+"""
+import copy
+import time
+import operator
+import threading
+
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq}
+
+
+class MemorySnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+
+class MemoryDocument:
+    def __init__(self, collection, doc_id):
+        self.collection = collection
+        self.id = doc_id
+
+    def get(self):
+        self.collection.client.rpc()
+        self.collection.client.reads += 1
+        return MemorySnapshot(self, self.collection.docs.get(self.id))
+
+    def set(self, data):
+        self.collection.client.rpc()
+        self.collection.client.writes += 1
+        self.collection.docs[self.id] = copy.deepcopy(data)
+
+    def delete(self):
+        self.collection.client.rpc()
+        self.collection.client.deletes += 1
+        self.collection.docs.pop(self.id, None)
+
+
+class MemoryCollection:
+    def __init__(self, client):
+        self.client = client
+        self.docs = {}
+
+    def document(self, doc_id):
+        return MemoryDocument(self, doc_id)
+
+    def stream(self):
+        return MemoryQuery(self).stream()
+
+    def where(self, field_path=None, op_string=None, value=None, *, filter=None):
+        return MemoryQuery(self).where(field_path, op_string, value, filter=filter)
+
+
+class MemoryQuery:
+    """A query on a collection; only document-id filters ("__name__") are supported."""
+
+    def __init__(self, collection, filters=(), fields=None):
+        self.collection = collection
+        self.filters = list(filters)
+        self.fields = fields
+
+    def where(self, field_path=None, op_string=None, value=None, *, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        if field_path != "__name__":
+            raise NotImplementedError(f"MemoryQuery only filters on document ids, not {field_path}")
+        return MemoryQuery(self.collection, self.filters + [(OPERATORS[op_string], value.id)], self.fields)
+
+    def select(self, field_paths):
+        return MemoryQuery(self.collection, self.filters, list(field_paths))
+
+    def stream(self):
+        self.collection.client.rpc()
+        for doc_id in sorted(self.collection.docs):
+            if not all(compare(doc_id, value) for compare, value in self.filters):
+                continue
+            data = self.collection.docs[doc_id]
+            if self.fields is not None:
+                data = {field: data[field] for field in self.fields if field in data}
+            self.collection.client.reads += 1
+            yield MemorySnapshot(MemoryDocument(self.collection, doc_id), data)
+
+
+class MemoryBatch:
+    def __init__(self, client):
+        self.client = client
+        self.operations = []
+
+    def set(self, ref, data):
+        self.operations.append((ref, copy.deepcopy(data)))
+
+    def delete(self, ref):
+        self.operations.append((ref, None))
+
+    def commit(self):
+        self.client.rpc()
+        with self.client.lock:
+            for ref, data in self.operations:
+                if data is None:
+                    self.client.deletes += 1
+                    ref.collection.docs.pop(ref.id, None)
+                else:
+                    self.client.writes += 1
+                    ref.collection.docs[ref.id] = data
+
+
+class MemoryFirestore:
+    """Collections of documents held in dicts, with read/write/delete counters."""
+
+    def __init__(self, latency=0.0):
+        self.lock = threading.Lock()
+        self.collections = {}
+        self.latency = latency
+        self.reset_counts()
+
+    def rpc(self):
+        with self.lock:
+            self.rpcs += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def reset_counts(self):
+        self.rpcs = 0
+        self.reads = 0
+        self.writes = 0
+        self.deletes = 0
+
+    def collection(self, name):
+        if name not in self.collections:
+            self.collections[name] = MemoryCollection(self)
+        return self.collections[name]
+
+    def batch(self):
+        return MemoryBatch(self)
@@ -0,0 +1,296 @@
+"""
+Local mock of the timetable search site, for driving the browser scraper offline.
+
+The search page has the division and session option lists, the Search button,
+and results rendered from a JSON endpoint the way the live app renders them:
+app-course accordions whose bodies (campus, session, notes and app-course-section
+blocks) only appear once expanded, and a pagination with numbered links, an
+active page, and Previous/Next links. Courses are synthetic and spread over the
+divisions, so division shards return disjoint results. Every API response and
+accordion expansion can be delayed to model the live site.
+
+Run from the repository root:
+    python -m benchmarks.mock_ttb                         # 10 pages on http://127.0.0.1:8767/
+    python -m benchmarks.mock_ttb --pages 50 --latency 80 --expand-ms 30
+Then point a scraper at it by setting scraper.URL (see benchmarks/bench_scraper.py).
+"""
+import json
+import time
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ttb_http import DIVISIONS, PAGE_SIZE
+from benchmarks.bench_packing import synthetic_courses
+
+SESSIONS = ["Fall", "Winter", "Fall-Winter (Y)", "Summer (F)", "Summer (S)", "Summer (Y)"]
+
+PAGE_HTML = r"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Timetable Builder (mock)</title>
+<style>
+app-ttb-option { display: block; cursor: pointer; }
+app-ttb-option input { pointer-events: none; }
+.collapse:not(.show) { display: none; }
+</style>
+</head>
+<body>
+<div id="division"><div id="division-combo-bottom-container"></div></div>
+<div id="session"><div id="session-combo-bottom-container"></div></div>
+<button type="button" class="btn btn-primary">Search</button>
+<div id="results"></div>
+<script>
+var CONFIG = __CONFIG__;
+var state = {divisions: [], sessions: [], page: 1};
+
+function escapeHtml(value) {
+    return String(value).replace(/&/g, "&amp;").replace(/</g, "&lt;").replace(/>/g, "&gt;")
+        .replace(/"/g, "&quot;");
+}
+
+function renderOptions(containerId, names, selected) {
+    var container = document.getElementById(containerId);
+    names.forEach(function (name, index) {
+        var option = document.createElement("app-ttb-option");
+        option.innerHTML = '<label><input type="checkbox" tabindex="-1"> ' + escapeHtml(name) + '</label>';
+        option.addEventListener("click", function () {
+            var input = option.querySelector("input");
+            input.checked = !input.checked;
+            var position = selected.indexOf(index);
+            if (input.checked && position < 0) {
+                selected.push(index);
+            } else if (!input.checked && position >= 0) {
+                selected.splice(position, 1);
+            }
+        });
+        container.appendChild(option);
+    });
+}
+
+function labelled(label, value) {
+    return '<div class="col"><label>' + label + '</label><span>' + escapeHtml(value) + '</span></div>';
+}
+
+function sectionItem(label, value) {
+    return '<div class="section-item col"><label>' + label + '</label><div class="item-value">' +
+        escapeHtml(value === undefined ? "N/A" : value) + '</div></div>';
+}
+
+function courseBody(course) {
+    var sections = course.sections.map(function (section) {
+        return '<app-course-section><div class="section card"><div class="header"><span>' +
+            escapeHtml(section.code) + '</span></div><div class="row section-items">' +
+            sectionItem("Day/Time", section.day_time) + sectionItem("Location", section.location) +
+            sectionItem("Instructor", section.instructor) + sectionItem("Availability", section.availability) +
+            sectionItem("Waitlist", section.waitlist) +
+            sectionItem("Enrolment Controls", section.enrollment_control) +
+            sectionItem("Delivery Mode", section.delivery_mode) +
+            '</div></div></app-course-section>';
+    }).join("");
+    return '<div class="accordion-collapse collapse show"><div class="accordion-body">' +
+        '<div class="course-info row">' + labelled("Campus", course.campus) +
+        labelled("Session", course.session) + '</div>' +
+        '<div class="notes-details"><label>Notes</label><div class="notes">' +
+        escapeHtml(course.notes) + '</div></div>' +
+        '<div class="course-sections">' + sections + '</div></div></div>';
+}
+
+function renderCourse(course) {
+    var element = document.createElement("app-course");
+    element.innerHTML = '<div class="accordion-item"><h2 class="accordion-header">' +
+        '<button type="button" class="accordion-button collapsed" aria-expanded="false"><span>' +
+        escapeHtml(course.code_title) + '</span></button></h2></div>';
+    var button = element.querySelector("button.accordion-button");
+    button.addEventListener("click", function () {
+        if (button.getAttribute("aria-expanded") === "true") {
+            return;
+        }
+        setTimeout(function () {
+            element.querySelector(".accordion-item").insertAdjacentHTML("beforeend", courseBody(course));
+            button.classList.remove("collapsed");
+            button.setAttribute("aria-expanded", "true");
+        }, CONFIG.expandMs);
+    });
+    return element;
+}
+
+function pageItem(label, page, classes) {
+    var item = document.createElement("li");
+    item.className = "page-item" + (classes ? " " + classes : "");
+    var link = document.createElement("a");
+    link.className = "page-link";
+    link.href = "#";
+    link.textContent = label;
+    if (page !== null) {
+        link.addEventListener("click", function (event) {
+            event.preventDefault();
+            if (item.classList.contains("disabled") || item.classList.contains("active")) {
+                return;
+            }
+            load(page);
+        });
+    }
+    item.appendChild(link);
+    return item;
+}
+
+function renderPagination(page, totalPages) {
+    var list = document.createElement("ul");
+    list.className = "pagination";
+    list.appendChild(pageItem("Previous", page - 1, page === 1 ? "disabled" : ""));
+    var last = 0;
+    for (var n = 1; n <= totalPages; n++) {
+        if (n !== 1 && n !== totalPages && Math.abs(n - page) > CONFIG.window) {
+            continue;
+        }
+        if (n - last > 1) {
+            list.appendChild(pageItem("...", null, "disabled"));
+        }
+        list.appendChild(pageItem(String(n), n, n === page ? "active" : ""));
+        last = n;
+    }
+    list.appendChild(pageItem("Next", page + 1, page === totalPages ? "disabled" : ""));
+    var nav = document.createElement("nav");
+    nav.appendChild(list);
+    return nav;
+}
+
+function render(data) {
+    var results = document.getElementById("results");
+    results.innerHTML = "";
+    if (!data.courses.length) {
+        results.innerHTML = '<div class="alert alert-info results-error-info">No results found.</div>';
+        return;
+    }
+    data.courses.forEach(function (course) {
+        results.appendChild(renderCourse(course));
+    });
+    results.appendChild(renderPagination(data.page, data.total_pages));
+}
+
+function load(page) {
+    var query = "page=" + page + "&divisions=" + state.divisions.join(",") +
+        "&sessions=" + state.sessions.join(",");
+    fetch("/api/courses?" + query).then(function (response) {
+        return response.json();
+    }).then(function (data) {
+        state.page = data.page;
+        render(data);
+    });
+}
+
+renderOptions("division-combo-bottom-container", CONFIG.divisions, state.divisions);
+renderOptions("session-combo-bottom-container", CONFIG.sessions, state.sessions);
+document.querySelector("button.btn-primary").addEventListener("click", function () {
+    load(1);
+});
+</script>
+</body>
+</html>
+"""
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def send_payload(self, content_type, payload):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/":
+            self.send_payload("text/html; charset=utf-8", self.server.page_html)
+        elif url.path == "/api/courses":
+            query = parse_qs(url.query)
+            divisions = [int(i) for i in query.get("divisions", [""])[0].split(",") if i.isdigit()]
+            page = int(query.get("page", ["1"])[0])
+            if self.server.latency:
+                time.sleep(self.server.latency)
+            payload = json.dumps(self.server.results_page(divisions, page)).encode("utf-8")
+            self.send_payload("application/json", payload)
+        else:
+            self.send_error(404)
+            return
+        self.server.count(url.path)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockTimetable(ThreadingHTTPServer):
+    """
+    Threaded server for the mock site. courses holds every course, in the order
+    a search with all divisions returns them; course i belongs to division
+    i % len(DIVISIONS). latency (seconds) delays every API response, expand_ms
+    every accordion expansion, and window is how many numbered links the
+    pagination shows on each side of the active page.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, pages=10, host="127.0.0.1", port=0, latency=0.0, expand_ms=20, window=2, seed=0):
+        super().__init__((host, port), MockHandler)
+        self.courses = synthetic_courses(pages * PAGE_SIZE, seed)
+        for course in self.courses:
+            # Store what the page shows: the parser strips the text it reads.
+            course["notes"] = course["notes"].strip()
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = {}
+        config = {"divisions": DIVISIONS, "sessions": SESSIONS, "expandMs": expand_ms, "window": window}
+        self.page_html = PAGE_HTML.replace("__CONFIG__", json.dumps(config)).encode("utf-8")
+
+    def results_page(self, divisions, page):
+        selected = set(divisions)
+        matching = [course for i, course in enumerate(self.courses) if i % len(DIVISIONS) in selected]
+        total_pages = max(1, -(-len(matching) // PAGE_SIZE))
+        page = min(max(page, 1), total_pages)
+        start = (page - 1) * PAGE_SIZE
+        return {"page": page, "total_pages": total_pages, "courses": matching[start:start + PAGE_SIZE]}
+
+    def count(self, path):
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        """Serve in a background thread and return the server."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10, help="results pages for a full search (default: 10)")
+    parser.add_argument("--port", type=int, default=8767, help="port to listen on (default: 8767)")
+    parser.add_argument("--latency", type=float, default=0, help="added latency per API response in ms")
+    parser.add_argument("--expand-ms", type=int, default=20, help="delay before an accordion renders in ms")
+    parser.add_argument("--window", type=int, default=2,
+                        help="numbered page links shown on each side of the active page (default: 2)")
+    args = parser.parse_args()
+
+    server = MockTimetable(args.pages, port=args.port, latency=args.latency / 1000,
+                           expand_ms=args.expand_ms, window=args.window)
+    print(f"Serving a {args.pages}-page mock timetable on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Local stand-in for the timetable backend that replays recorded responses.
+
+Responses are looked up by ttb_http.recording_key (endpoint, request body minus
+the page, and the page), the same name TimetableClient(record_dir=...) saves them
+under, so a recorded run can be replayed offline. Unknown requests get a 404.
+
+Run from the repository root:
+    python -m benchmarks.replay_server                      # serves benchmarks/fixtures/api
+    python -m benchmarks.replay_server --latency 150        # add 150ms per response
+    python -m benchmarks.replay_server --recordings runs/   # a run saved with --record runs/
+Then point a scraper at it with --fetch http --api-url http://127.0.0.1:8765/
+(the scraper's term must match the one the recordings were made for).
+"""
+import os
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ttb_http import recording_key
+
+RECORDINGS = os.path.join(os.path.dirname(__file__), "fixtures", "api")
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real backend
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        endpoint = self.path.strip("/").split("/")[-1]
+        path = os.path.join(self.server.recordings, recording_key(endpoint, body))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if not os.path.exists(path):
+            self.send_error(404, "No recording for this request")
+            return
+        with open(path, "rb") as f:
+            payload = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Threaded HTTP server replaying the recordings in a directory, with optional latency (seconds)."""
+
+    daemon_threads = True
+
+    def __init__(self, recordings=RECORDINGS, host="127.0.0.1", port=0, latency=0.0):
+        super().__init__((host, port), ReplayHandler)
+        self.recordings = recordings
+        self.latency = latency
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        """Serve in a background thread and return the server."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recordings", default=RECORDINGS, help="directory of recorded responses")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    parser.add_argument("--latency", type=float, default=0, help="added latency per response in ms")
+    args = parser.parse_args()
+
+    server = ReplayServer(args.recordings, port=args.port, latency=args.latency / 1000)
+    print(f"Replaying {args.recordings} on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
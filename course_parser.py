@@ -0,0 +1,172 @@
+import json
+from bs4 import BeautifulSoup
+import ttb_metrics
+
+# JavaScript that extracts the courses on the current results page inside the browser
+# and returns them as a JSON string in one WebDriver round trip.
+# It mirrors parse_courses_html: text() behaves like BeautifulSoup's get_text(strip=True)
+# (every text node stripped with Python's whitespace rules, empty ones dropped, joined
+# with ""), and labelled() behaves like the "label:contains(...) + span" selector.
+EXTRACT_COURSES_JS = r"""
+var WS = "\t\n\x0b\x0c\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000";
+var STRIP = new RegExp("^[" + WS + "]+|[" + WS + "]+$", "g");
+
+function text(el) {
+    var parts = [];
+    var walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT);
+    var node;
+    while ((node = walker.nextNode())) {
+        var parent = node.parentNode.nodeName;
+        if (parent === "SCRIPT" || parent === "STYLE") {
+            continue;
+        }
+        var value = node.nodeValue.replace(STRIP, "");
+        if (value) {
+            parts.push(value);
+        }
+    }
+    return parts.join("");
+}
+
+function textOr(el, fallback) {
+    return el ? text(el) : fallback;
+}
+
+function labelled(body, name) {
+    var spans = body.querySelectorAll("label + span");
+    for (var i = 0; i < spans.length; i++) {
+        if (spans[i].previousElementSibling.textContent.indexOf(name) !== -1) {
+            return spans[i];
+        }
+    }
+    return null;
+}
+
+var SECTION_FIELDS = [
+    ["Day/Time", "day_time"],
+    ["Location", "location"],
+    ["Instructor", "instructor"],
+    ["Availability", "availability"],
+    ["Waitlist", "waitlist"],
+    ["Enrolment Controls", "enrollment_control"],
+    ["Delivery Mode", "delivery_mode"]
+];
+
+var pageData = [];
+var courses = document.querySelectorAll("app-course");
+for (var c = 0; c < courses.length; c++) {
+    var course = courses[c];
+    var codeTitle = textOr(course.querySelector(".accordion-button span"), "N/A");
+    var body = course.querySelector(".accordion-body");
+    var campus = "N/A", session = "N/A", notes = "N/A";
+    if (body) {
+        campus = textOr(labelled(body, "Campus"), "N/A");
+        session = textOr(labelled(body, "Session"), "N/A");
+        notes = textOr(body.querySelector(".notes-details .notes"), "N/A");
+    }
+    var sections = [];
+    var sectionElems = course.querySelectorAll(".course-sections app-course-section");
+    for (var s = 0; s < sectionElems.length; s++) {
+        var sectionInfo = {code: textOr(sectionElems[s].querySelector(".header span"), "N/A")};
+        var details = sectionElems[s].querySelectorAll(".section-item");
+        for (var d = 0; d < details.length; d++) {
+            var label = textOr(details[d].querySelector("label"), "");
+            var value = textOr(details[d].querySelector(".item-value"), "N/A");
+            for (var f = 0; f < SECTION_FIELDS.length; f++) {
+                if (label.indexOf(SECTION_FIELDS[f][0]) !== -1) {
+                    sectionInfo[SECTION_FIELDS[f][1]] = value;
+                    break;
+                }
+            }
+        }
+        sections.push(sectionInfo);
+    }
+    pageData.push({
+        code_title: codeTitle,
+        campus: campus,
+        session: session,
+        notes: notes,
+        sections: sections
+    });
+}
+return JSON.stringify(pageData);
+"""
+
+
+def parse_courses_html(html):
+    """Parse the courses out of an (expanded) results page's HTML."""
+    soup = BeautifulSoup(html, "html.parser")
+    courses = soup.select("app-course")
+    page_data = []
+    for course_elem in courses:
+        header = course_elem.select_one(".accordion-button span")
+        code_title = header.get_text(strip=True) if header else "N/A"
+        body = course_elem.select_one(".accordion-body")
+        if not body:
+            campus = session = notes = "N/A"
+        else:
+            campus_elem = body.select_one("label:contains('Campus') + span")
+            campus = campus_elem.get_text(strip=True) if campus_elem else "N/A"
+            session_elem = body.select_one("label:contains('Session') + span")
+            session = session_elem.get_text(strip=True) if session_elem else "N/A"
+            notes_elem = body.select_one(".notes-details .notes")
+            notes = notes_elem.get_text(strip=True) if notes_elem else "N/A"
+        sections = []
+        section_elems = course_elem.select(".course-sections app-course-section")
+        for section_elem in section_elems:
+            section_code_elem = section_elem.select_one(".header span")
+            section_code = section_code_elem.get_text(strip=True) if section_code_elem else "N/A"
+            details = section_elem.select(".section-item")
+            section_info = {"code": section_code}
+            for detail in details:
+                label_elem = detail.select_one("label")
+                label = label_elem.get_text(strip=True) if label_elem else ""
+                value_elem = detail.select_one(".item-value")
+                value = value_elem.get_text(strip=True) if value_elem else "N/A"
+                if "Day/Time" in label:
+                    section_info["day_time"] = value
+                elif "Location" in label:
+                    section_info["location"] = value
+                elif "Instructor" in label:
+                    section_info["instructor"] = value
+                elif "Availability" in label:
+                    section_info["availability"] = value
+                elif "Waitlist" in label:
+                    section_info["waitlist"] = value
+                elif "Enrolment Controls" in label:
+                    section_info["enrollment_control"] = value
+                elif "Delivery Mode" in label:
+                    section_info["delivery_mode"] = value
+            sections.append(section_info)
+        page_data.append({
+            "code_title": code_title,
+            "campus": campus,
+            "session": session,
+            "notes": notes,
+            "sections": sections
+        })
+    return page_data
+
+
+def extract_courses(driver):
+    """Extract the courses on the current (expanded) results page inside the browser."""
+    payload = driver.execute_script(EXTRACT_COURSES_JS)
+    ttb_metrics.metrics.count("bytes_parsed", len(payload.encode("utf-8")), mode="script")
+    return json.loads(payload)
+
+
+def read_courses(driver, mode="soup", snapshot=None):
+    """
+    Read the current results page with the given extraction mode ("soup" or "script").
+    snapshot, if given, is called with the page's HTML (an extra round trip in script mode).
+    """
+    with ttb_metrics.metrics.phase("parse"):
+        if mode == "script":
+            if snapshot is not None:
+                snapshot(driver.page_source)
+            return extract_courses(driver)
+        html = driver.page_source
+        if snapshot is not None:
+            snapshot(html)
+        ttb_metrics.metrics.count("bytes_parsed", len(html.encode("utf-8")), mode="soup")
+        return parse_courses_html(html)
@@ -0,0 +1,763 @@
+"""
+Scrape the timetable for one or more terms and upload each to Firestore.
+
+Every term in TERMS is a profile: the prefix of its Firestore documents, journal
+and output files, and how many session options its search selects. The terms of
+a run share one process, so they share the warm browser pool, the Firestore
+client and the upload threads; with --term-workers they are scraped concurrently.
+    python scraper.py                          # every term, one after the other
+    python scraper.py --terms summer           # what scraper_multithreaded_summer.py ran
+    python scraper.py --term-workers 3 --threads 3
+"""
+import os
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ttb_terms import TERMS
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
+import ttb_wait
+import ttb_metrics
+from course_parser import read_courses
+from ttb_driver import BLOCKED_RESOURCES, RESOURCE_URL_PATTERNS, BrowserProfile, DriverPool, launch_chrome
+from ttb_accordion import expand_by_clicking, expand_in_page
+from ttb_navigation import (
+    NEXT_LINK_XPATH, NavigationStats, PageScheduler, click_next, go_to_page, read_total_pages
+)
+from ttb_search import (
+    DIVISION_OPTION_CSS, SESSION_OPTION_CSS, SearchLinks, ShardScheduler, count_options,
+    select_options, select_options_in_page, submit_search
+)
+from ttb_journal import PageJournal
+from ttb_snapshots import SnapshotStore
+from ttb_records import compact_courses, plain
+from ttb_schedule import add_meetings
+from ttb_workers import WORKERS_PER_CPU, WorkerController, cpu_count, worker_limit
+from ttb_output import OUTPUT_FORMATS, CourseWriter, iter_courses, load_courses
+from ttb_http import API_URL, DIVISIONS, TimetableClient, term_sessions
+from ttb_poll import POLL_PAGE_SIZE, AvailabilityPoller
+from ttb_firestore import (
+    CHANGES_COLLECTION, MANIFEST_COLLECTION, BackgroundUpload, replace_chunks,
+    stored_courses, sync_chunks, write_changes
+)
+from ttb_changes import append_entry, change_entry, summary
+
+# Global URL (change if needed)
+URL = "https://ttb.utoronto.ca/"
+
+# JavaScript to disable all animations and transitions
+DISABLE_ANIMATIONS_JS = """
+var css = document.createElement("style");
+css.type = "text/css";
+css.innerHTML = "* { animation: none !important; transition: none !important; }";
+document.head.appendChild(css);
+"""
+
+# How each results page is read: "soup" parses driver.page_source with BeautifulSoup,
+# "script" extracts the courses inside the browser and returns them as JSON.
+EXTRACTION = "soup"
+
+# How accordions are expanded: "click" clicks each button natively with a short sleep,
+# "bulk" expands them all in one in-page call that waits for the DOM to settle.
+EXPANSION = "click"
+
+# How search filters are set up: "click" clicks each option with a wait after each,
+# "bulk" clicks them all in one in-page call and verifies the selection,
+# "url" does the same but reuses a results URL that encodes an identical search.
+FILTERS = "click"
+
+# How scraped courses are held until they are saved: "dict" as plain dicts,
+# "compact" as slotted records with interned values (ttb_records), same JSON.
+RECORDS = "dict"
+
+# Whether each section also gets its day_time parsed into "meetings" intervals (ttb_schedule).
+MEETINGS = False
+
+# Results URLs learned from completed searches (used by FILTERS = "url").
+LINKS = SearchLinks(URL)
+
+# Where every read results page's HTML is saved for re-parsing (None: not saved).
+SNAPSHOTS = None
+
+# Warm Chrome instances shared by every worker of every term; the driver binary is resolved once.
+POOL = DriverPool()
+
+# Firestore client shared by every term, created on first use.
+FIRESTORE = None
+firestore_lock = threading.Lock()
+
+def load_search_page(driver):
+    """Open the search page with animations disabled."""
+    with ttb_metrics.metrics.phase("page_load"):
+        driver.get(URL)
+        driver.execute_script(DISABLE_ANIMATIONS_JS)
+
+def start_search(driver, term, thread_index, stats, divisions=None, sessions=None, loaded=False):
+    """
+    Search with the term's filters (every division, or the given indices) and
+    return False if there are no results. The search page is loaded first unless
+    loaded is set. With FILTERS = "url", a results URL learned from an identical
+    search is loaded instead, falling back to the form (and forgetting the URL)
+    if it times out or shows no results. Filter setup time goes to stats.
+    """
+    key = (term.name, None if divisions is None else tuple(divisions),
+           None if sessions is None else tuple(sessions))
+    link = LINKS.get(key) if FILTERS == "url" else None
+    if link is not None:
+        start = time.perf_counter()
+        try:
+            with ttb_metrics.metrics.phase("page_load"):
+                driver.get(link)
+                driver.execute_script(DISABLE_ANIMATIONS_JS)
+                found = ttb_wait.strategy.search_results(driver)
+        except TimeoutException:
+            found = False
+        if found:
+            stats.record_setup(time.perf_counter() - start, linked=True)
+            return True
+        LINKS.forget(key)
+        loaded = False
+    if not loaded:
+        load_search_page(driver)
+    start = time.perf_counter()
+    with ttb_metrics.metrics.phase("filter_setup"):
+        select_filters(driver, term, thread_index, divisions, sessions)
+    stats.record_setup(time.perf_counter() - start)
+    with ttb_metrics.metrics.phase("search"):
+        found = submit_search(driver)
+    if found and FILTERS == "url":
+        LINKS.learn(key, driver.current_url)
+    return found
+
+def select_filters(driver, term, thread_index, divisions=None, sessions=None):
+    """Select the division options (all, or the given indices) and the term's session options."""
+    select = select_options if FILTERS == "click" else select_options_in_page
+    count = select(driver, "division", DIVISION_OPTION_CSS, divisions)
+    print(f"{term.name} thread {thread_index}: Selected division options:", count)
+    if term.session_limit != 0:
+        count = select(driver, "session", SESSION_OPTION_CSS, sessions,
+                       limit=term.session_limit, delay=0.5)
+        print(f"{term.name} thread {thread_index}: Selected session options:", count)
+
+def scrape_current_page(driver, term, thread_index, stats, order):
+    """
+    Expand every accordion on the current results page and read its courses.
+    With SNAPSHOTS, the page's HTML is saved under order, its place in the output.
+    """
+    with ttb_metrics.metrics.phase("accordions"):
+        if EXPANSION == "bulk":
+            expanded, failed = expand_in_page(driver)
+            if failed:
+                print(f"Thread {thread_index}: {failed} accordions did not expand ({expanded} expanded)")
+        else:
+            expanded, failed = expand_by_clicking(driver, thread_index)
+    stats.record_expansion(expanded, failed)
+    
+    snapshot = None
+    if SNAPSHOTS is not None:
+        snapshot = lambda html: SNAPSHOTS.record(term, order, html)
+    return prepare_courses(read_courses(driver, EXTRACTION, snapshot))
+
+def prepare_courses(page_data):
+    """Add the meeting intervals (MEETINGS) and convert to records (RECORDS) as configured."""
+    if MEETINGS:
+        add_meetings(page_data)
+    if RECORDS == "compact":
+        page_data = compact_courses(page_data)
+    return page_data
+
+def scrape_pages(driver, term, thread_index, stats, skip=0, order=()):
+    """
+    Scrape the current page and every following page.
+    After each 'Next' click, skip further pages (stride mode) before scraping again.
+    A page's latency runs from reaching it to reaching the next one. Its snapshot
+    order is order followed by its position in this call.
+    """
+    thread_data = []
+    position = 0
+    while True:
+        start = time.perf_counter()
+        page_data = scrape_current_page(driver, term, thread_index, stats, (*order, position))
+        position += 1
+        thread_data.extend(page_data)
+        stats.record_page()
+        POOL.record_page(driver)
+        
+        with ttb_metrics.metrics.phase("pagination"):
+            more = click_next(driver, 1, stats, delay=0.5)
+            if more and skip > 0:
+                more = click_next(driver, skip, stats)
+        ttb_metrics.metrics.record_page(term.name, thread_index, None,
+                                        time.perf_counter() - start, len(page_data))
+        if not more:
+            break
+    return thread_data
+
+def scrape_queue(driver, term, thread_index, scheduler, stats, controller=None):
+    """
+    Queue mode: pull page numbers from the shared scheduler and jump straight to
+    each page before scraping it. If the browser fails mid-page, the page is
+    marked failed (so --resume redoes it) and the error is raised.
+    When the pool says the browser is due, it is recycled and searches again.
+    With a controller (--threads auto), the first worker here plans the worker
+    count, and every worker reports its pages and stops when told to.
+    Returns the browser in use at the end.
+    """
+    scheduler.populate(read_total_pages(driver))
+    if controller is not None:
+        controller.plan(scheduler.total_pages, driver)
+    while True:
+        if controller is not None and not controller.keep_running(thread_index):
+            break
+        page = scheduler.next_page()
+        if page is None:
+            break
+        start = time.perf_counter()
+        try:
+            with ttb_metrics.metrics.phase("pagination"):
+                reached = go_to_page(driver, page, stats)
+            if not reached:
+                print(f"Thread {thread_index}: Could not reach page {page}")
+                ttb_metrics.metrics.count("pages_failed", term=term.name)
+                if controller is not None:
+                    controller.record_error()
+                scheduler.fail(page)
+                continue
+            page_data = scrape_current_page(driver, term, thread_index, stats, (page,))
+            # Extend before completing, so no other worker exits thinking this was the last page.
+            if page == scheduler.total_pages and driver.find_elements(By.XPATH, NEXT_LINK_XPATH):
+                scheduler.extend(read_total_pages(driver))
+        except Exception:
+            ttb_metrics.metrics.count("pages_failed", term=term.name)
+            scheduler.fail(page)
+            raise
+        scheduler.complete(page, page_data)
+        elapsed = time.perf_counter() - start
+        ttb_metrics.metrics.record_page(term.name, thread_index, page, elapsed, len(page_data))
+        if controller is not None:
+            controller.record_page(elapsed)
+        stats.record_page()
+        if POOL.record_page(driver):
+            driver = POOL.recycle(driver)
+            if not start_search(driver, term, thread_index, stats):
+                break
+    return driver
+
+def process_pages(term, thread_index, total_threads=5, scheduler=None, stats=None, controller=None):
+    """
+    Each thread:
+      - Takes a headless Chrome instance from the pool (returned at the end).
+      - Loads the page, disables animations, selects all division options
+        (and the term's session options), and clicks the Search button.
+      - With a scheduler (queue mode): pulls page numbers from the shared queue
+        and jumps straight to each page before scraping it (scrape_queue),
+        under the controller's worker count if there is one.
+      - Without one (stride mode): advances to its starting page based on
+        thread_index, scrapes the current page, then clicks 'Next' and jumps
+        ahead (total_threads pages per cycle).
+    """
+    stats = stats or NavigationStats()
+    driver = POOL.acquire()
+    try:
+        if not start_search(driver, term, thread_index, stats):
+            print(f"{term.name}: No results found. Exiting search.")
+            return []  # Exit immediately if no results.
+        
+        if scheduler is not None:
+            driver = scrape_queue(driver, term, thread_index, scheduler, stats, controller)
+            return []
+        
+        # Advance to the starting page based on thread_index.
+        with ttb_metrics.metrics.phase("pagination"):
+            for i in range(thread_index):
+                if not click_next(driver, 1, stats):
+                    break
+        
+        return scrape_pages(driver, term, thread_index, stats, skip=total_threads - 1,
+                            order=(thread_index,))
+    except Exception:
+        # Don't hand a broken browser to the next task.
+        POOL.discard(driver)
+        driver = None
+        raise
+    finally:
+        if driver is not None:
+            POOL.release(driver)
+
+def process_shards(term, thread_index, shards, stats=None):
+    """
+    Each thread pulls (division, session) shards from the shared queue and, for
+    each one, runs its own search with only that division (and session)
+    selected, then scrapes every page of it with no skipping.
+    """
+    stats = stats or NavigationStats()
+    driver = POOL.acquire()
+    try:
+        driver = scrape_shards(driver, term, thread_index, shards, stats)
+    except Exception:
+        POOL.discard(driver)
+        raise
+    POOL.release(driver)
+
+def scrape_shards(driver, term, thread_index, shards, stats):
+    """Scrape shards until the queue is empty. Returns the browser in use at the end."""
+    load_search_page(driver)
+    num_divisions = count_options(driver, "division", DIVISION_OPTION_CSS)
+    num_sessions = 0
+    if term.session_limit != 0:
+        num_sessions = count_options(driver, "session", SESSION_OPTION_CSS, term.session_limit)
+    shards.populate(num_divisions, num_sessions)
+    
+    fresh_page = True
+    while True:
+        shard = shards.next_shard()
+        if shard is None:
+            break
+        division, session = shard
+        if POOL.needs_recycle(driver):
+            driver = POOL.recycle(driver)
+            fresh_page = False
+        found = start_search(driver, term, thread_index, stats, [division],
+                             None if session is None else [session], loaded=fresh_page)
+        fresh_page = False
+        if not found:
+            print(f"{term.name} thread {thread_index}: No results for shard {shard}")
+            shards.complete(shard, [])
+            continue
+        shards.complete(shard, scrape_pages(driver, term, thread_index, stats, order=shard))
+    return driver
+
+def fetch_over_http(term, total_threads, api_url, record_dir=None):
+    """Fetch every course of a term straight from the timetable backend, without a browser."""
+    client = TimetableClient(api_url, max_workers=total_threads, record_dir=record_dir)
+    try:
+        with ttb_metrics.metrics.phase("http_fetch"):
+            all_course_data = client.fetch_all(DIVISIONS, term_sessions(term.name))
+    finally:
+        client.close()
+        ttb_metrics.metrics.count("http_requests", client.requests, term=term.name)
+    print(f"{term.name}: HTTP: fetched {len(all_course_data)} courses in {client.requests} requests")
+    return all_course_data
+
+def connect_firestore():
+    """Initialize Firebase Admin on the first call and return the shared Firestore client."""
+    global FIRESTORE
+    with firestore_lock:
+        if FIRESTORE is None:
+            import firebase_admin
+            from firebase_admin import credentials, firestore
+            # Initialize Firebase Admin with your service account key file
+            cred = credentials.Certificate("serviceAccountKey.json")
+            firebase_admin.initialize_app(cred)
+            FIRESTORE = firestore.client()
+    return FIRESTORE
+
+def upload_courses(args, term, courses, eager=False):
+    """
+    Upload a term's courses in chunks to Firestore, overwriting only documents with
+    its prefix. eager commits each chunk as soon as it is packed (for --pipeline).
+    """
+    db = connect_firestore()
+    collection_ref = db.collection('courses')
+    manifest_ref = db.collection(MANIFEST_COLLECTION).document(f"{term.prefix}manifest")
+    upload = sync_chunks if args.upload == "sync" else replace_chunks
+    with ttb_metrics.metrics.phase("upload"):
+        upload_stats = upload(db, collection_ref, manifest_ref, term.prefix, courses,
+                              args.upload_workers, eager=eager)
+    ttb_metrics.metrics.count("firestore_rpcs", upload_stats.rpcs, term=term.name)
+    ttb_metrics.metrics.count("firestore_retries", upload_stats.retries, term=term.name)
+    ttb_metrics.metrics.count("firestore_documents_written", upload_stats.written, term=term.name)
+    ttb_metrics.metrics.count("firestore_documents_deleted", upload_stats.deleted, term=term.name)
+    return upload_stats
+
+def previous_courses(args, term):
+    """
+    The courses of the term's previous run, for --changes: its output file if it
+    is still here, otherwise what the last upload left in Firestore (None if neither).
+    """
+    path = f"{term.prefix}course_data.{args.output}"
+    if os.path.exists(path):
+        return load_courses(path)
+    db = connect_firestore()
+    return stored_courses(db.collection('courses'),
+                          db.collection(MANIFEST_COLLECTION).document(f"{term.prefix}manifest"))
+
+def publish_changes(term, entry):
+    """Store a term's change-feed entry as its changes document, once its chunks are uploaded."""
+    db = connect_firestore()
+    stored = write_changes(db.collection(CHANGES_COLLECTION).document(f"{term.prefix}changes"), entry)
+    if stored["full"] and not entry["full"]:
+        print(f"{term.name}: Changes: too large for one document; clients will fetch the chunks.")
+    else:
+        print(f"{term.name}: Changes stored in {CHANGES_COLLECTION}/{term.prefix}changes.")
+
+def worker_count(value):
+    """argparse type for --threads: a positive number or "auto"."""
+    if value == "auto":
+        return value
+    try:
+        count = int(value)
+    except ValueError:
+        count = 0
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive number or auto, got {value!r}")
+    return count
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms", nargs="+", choices=list(TERMS), default=list(TERMS),
+                        help="terms to scrape (default: all of them)")
+    parser.add_argument("--term-workers", type=int, default=1,
+                        help="terms scraped at the same time, each with --threads workers (default: 1)")
+    parser.add_argument("--threads", type=worker_count, default=5,
+                        help="number of Chrome workers per term, or concurrent requests with "
+                             "--fetch http (default: 5); auto sizes them from the CPUs, the memory "
+                             "and the page count, and with --scheduler queue keeps adjusting them "
+                             "from the page latency and errors")
+    parser.add_argument("--max-threads", type=int,
+                        help="with --threads auto, never run more workers than this")
+    parser.add_argument("--recycle-pages", type=int,
+                        help="relaunch a browser after it has scraped this many pages")
+    parser.add_argument("--recycle-rss", type=float, metavar="MB",
+                        help="relaunch a browser once its processes use more than MB MiB")
+    parser.add_argument("--lean", action="store_true",
+                        help="launch Chrome with a lean profile: unneeded features off, "
+                             "analytics and the --block resource types blocked")
+    parser.add_argument("--block", default=",".join(BLOCKED_RESOURCES),
+                        help="with --lean, comma-separated resource types to block, from "
+                             f"{', '.join(RESOURCE_URL_PATTERNS)} (default: {','.join(BLOCKED_RESOURCES)})")
+    parser.add_argument("--block-url", action="append", default=[], metavar="PATTERN",
+                        help="with --lean, also block URLs matching PATTERN (may be repeated)")
+    parser.add_argument("--fetch", choices=["browser", "http"], default="browser",
+                        help="browser: drive headless Chrome through the search page; "
+                             "http: call the timetable's JSON backend directly")
+    parser.add_argument("--api-url", default=API_URL,
+                        help="with --fetch http, the backend URL (e.g. the replay server in "
+                             "benchmarks/replay_server.py)")
+    parser.add_argument("--record", metavar="DIR",
+                        help="with --fetch http, also save every response to DIR for replaying")
+    parser.add_argument("--poll", action="store_true",
+                        help="instead of scraping, read only each term's availability and waitlist "
+                             "from the backend (--api-url) and append what changed since the last "
+                             "poll or the term's --output file to <prefix>availability.ndjson")
+    parser.add_argument("--poll-every", type=float, metavar="SECONDS",
+                        help="with --poll, poll again every SECONDS until interrupted (default: once)")
+    parser.add_argument("--poll-page-size", type=int, default=POLL_PAGE_SIZE,
+                        help=f"with --poll, courses requested per page (default: {POLL_PAGE_SIZE}); "
+                             "a backend that serves fewer is followed")
+    parser.add_argument("--scheduler", choices=["queue", "stride", "shard"], default="queue",
+                        help="queue: workers pull page numbers and jump to them; "
+                             "stride: every worker clicks through every page (legacy); "
+                             "shard: every worker runs its own search for a subset of divisions")
+    parser.add_argument("--shard-sessions", action="store_true",
+                        help="with --scheduler shard, also split the session options across searches")
+    parser.add_argument("--extract", choices=["soup", "script"], default=EXTRACTION,
+                        help="soup: parse page_source with BeautifulSoup; "
+                             "script: extract the courses in the page as JSON")
+    parser.add_argument("--expand", choices=["click", "bulk"], default=EXPANSION,
+                        help="click: click each accordion button; "
+                             "bulk: expand all accordions in one in-page call")
+    parser.add_argument("--filters", choices=["click", "bulk", "url"], default=FILTERS,
+                        help="click: click each filter option with a wait after each; "
+                             "bulk: select them all in one in-page call, then verify the selection; "
+                             "url: like bulk, but reuse the results URL of an identical search "
+                             "when the site encodes the filters in it")
+    parser.add_argument("--records", choices=["dict", "compact"], default=RECORDS,
+                        help="dict: hold scraped courses as dicts; "
+                             "compact: as slotted records with interned values (same output)")
+    parser.add_argument("--meetings", action="store_true",
+                        help="also store each section's day_time as \"meetings\": "
+                             "[{\"day\": 0 (Monday) to 6, \"start\": minute, \"end\": minute}, ...]")
+    parser.add_argument("--wait", choices=["signal", "sleep"], default="signal",
+                        help="signal: wait for page/network signals; sleep: fixed sleeps (legacy)")
+    parser.add_argument("--wait-timeout", type=float, default=10,
+                        help="fallback timeout in seconds for each signal wait (default: 10)")
+    parser.add_argument("--upload", choices=["sync", "replace"], default="sync",
+                        help="sync: write only changed chunks and delete orphaned ones; "
+                             "replace: delete this program's documents and rewrite them all")
+    parser.add_argument("--output", choices=OUTPUT_FORMATS, default="json",
+                        help="json: write <prefix>course_data.json at the end of each term; "
+                             "ndjson / ndjson.gz: append each page's courses to "
+                             "<prefix>course_data.ndjson(.gz) as it is scraped (convert with ttb_output.py)")
+    parser.add_argument("--changes", action="store_true",
+                        help="compare each term's courses with its previous run's (the output file, "
+                             "or else the chunks in Firestore), append the differences to "
+                             "<prefix>changes.ndjson and, after the upload, store them in "
+                             f"{CHANGES_COLLECTION}/<prefix>changes for clients to fetch instead of the chunks")
+    parser.add_argument("--snapshots", metavar="DIR",
+                        help="save every results page's expanded HTML, gzip-compressed and "
+                             "content-addressed, under DIR, so ttb_snapshots.py can rebuild the "
+                             "output with the current parser without a browser")
+    parser.add_argument("--resume", action="store_true",
+                        help="with --scheduler queue, keep the pages recorded in each term's "
+                             "journal by an interrupted run and scrape only the missing ones")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="with --scheduler queue and --upload sync, upload each term's chunks in "
+                             "the background while it is being scraped instead of after it")
+    parser.add_argument("--upload-workers", type=int, default=4,
+                        help="batched Firestore writes committed concurrently (default: 4)")
+    parser.add_argument("--metrics", default="run_metrics", metavar="BASE",
+                        help="write the run's phase timings, per-page latencies and counters to "
+                             "BASE.json and, in Prometheus text format, BASE.prom "
+                             "(default: run_metrics; empty to skip)")
+    parser.add_argument("--report-phases", action="store_true",
+                        help="print the time per phase and the page latency at the end of the run")
+    parser.add_argument("--report-waits", action="store_true",
+                        help="print the time spent waiting per phase at the end of the run")
+    parser.add_argument("--report-pool", action="store_true",
+                        help="print browser launches, launch time, reuses and recycles "
+                             "at the end of the run")
+    parser.add_argument("--report-clicks", action="store_true",
+                        help="print pagination clicks per scraped page, accordion counts "
+                             "and filter setup time at the end of each term")
+    args = parser.parse_args(argv)
+    args.block = [resource for resource in args.block.split(",") if resource]
+    unknown = set(args.block) - set(RESOURCE_URL_PATTERNS)
+    if unknown:
+        parser.error(f"unknown resource types for --block: {', '.join(sorted(unknown))}")
+    if args.snapshots and args.fetch != "browser":
+        parser.error("--snapshots needs --fetch browser")
+    if args.pipeline and (args.fetch != "browser" or args.scheduler != "queue"):
+        parser.error("--pipeline needs --fetch browser and --scheduler queue")
+    if args.pipeline and args.upload == "replace":
+        # replace deletes the term's documents before the first page would be scraped.
+        parser.error("--pipeline needs --upload sync")
+    if args.resume and (args.fetch != "browser" or args.scheduler != "queue"):
+        parser.error("--resume needs --fetch browser and --scheduler queue")
+    if (args.poll_every or args.poll_page_size != POLL_PAGE_SIZE) and not args.poll:
+        parser.error("--poll-every and --poll-page-size need --poll")
+    return args
+
+
+def scrape_term(args, term):
+    """
+    Scrape one term and save its courses to <prefix>course_data.<output>.
+    Returns the term's upload, running in the background so that it overlaps
+    the terms still being scraped, and its change-feed entry (None without --changes).
+    """
+    total_threads = args.threads
+    adaptive = total_threads == "auto" and args.fetch == "browser" and args.scheduler == "queue"
+    if total_threads == "auto" and not adaptive:
+        # No page count to size against or queue to resize: size from the host only.
+        total_threads = worker_limit(max_workers=args.max_threads)
+        print(f"{term.name}: Workers: using {total_threads} for this host")
+    stats = NavigationStats()
+    all_course_data = []
+    uploader = None
+    writer = None
+    journal = None
+    streamed = False
+    previous = None
+    if args.changes:
+        # Read before this run overwrites the output file or the chunks.
+        try:
+            with ttb_metrics.metrics.phase("changes"):
+                previous = previous_courses(args, term)
+        except Exception as e:
+            print(f"{term.name}: Changes: could not read the previous run:", e)
+    if args.output != "json":
+        writer = CourseWriter(f"{term.prefix}course_data.{args.output}")
+    if SNAPSHOTS is not None:
+        SNAPSHOTS.open(term, args.scheduler, resume=args.resume)
+    if args.fetch == "browser" and not adaptive:
+        # Launch the browsers the pool is missing side by side before the workers start.
+        POOL.prewarm(total_threads)
+    if args.fetch == "http":
+        all_course_data = prepare_courses(fetch_over_http(term, total_threads, args.api_url, args.record))
+    elif args.scheduler == "queue":
+        # Completed pages are journaled so an interrupted run can be resumed.
+        journal = PageJournal(f"{term.prefix}journal.ndjson", resume=args.resume)
+        # With a writer, pages go to the file in page order and are not kept in memory.
+        scheduler = PageScheduler(keep_results=writer is None, journal=journal)
+        if writer is not None:
+            scheduler.add_sink(writer.write)
+            streamed = True
+        if args.pipeline:
+            # Pack and upload pages in page order as they are scraped.
+            uploader = BackgroundUpload(upload_courses, args, term, scheduler.open_stream(), True)
+        scheduler.restore({page: prepare_courses(page_data) for page, page_data in journal.pages.items()})
+        try:
+            if adaptive:
+                with ThreadPoolExecutor(max_workers=args.max_threads or cpu_count() * WORKERS_PER_CPU) as executor:
+                    controller = WorkerController(
+                        lambda i: executor.submit(process_pages, term, i, None, scheduler, stats, controller),
+                        scheduler.pages.qsize, args.max_threads)
+                    controller.launch()
+                    controller.join()
+            else:
+                with ThreadPoolExecutor(max_workers=total_threads) as executor:
+                    futures = [executor.submit(process_pages, term, i, total_threads, scheduler, stats)
+                               for i in range(total_threads)]
+                    for future in futures:
+                        future.result()
+            # Workers that could not search again (e.g. after recycling) leave pages queued.
+            scheduler.fail_remaining()
+        except BaseException as e:
+            # Stop the upload before it writes a manifest for a partial scrape.
+            scheduler.close(e)
+            if uploader is not None:
+                uploader.wait()
+            if writer is not None:
+                writer.close()
+            journal.close()
+            print(f"{term.name}: Scraping failed; rerun with --resume to keep the pages in {journal.path}.")
+            raise
+        scheduler.close()
+        all_course_data = scheduler.ordered_results()
+        if scheduler.failed:
+            print(f"{term.name}: Pages that could not be reached:", sorted(scheduler.failed))
+            print(f"Rerun with --resume to retry them and keep the pages in {journal.path}.")
+    elif args.scheduler == "shard":
+        shards = ShardScheduler(shard_sessions=args.shard_sessions)
+        with ThreadPoolExecutor(max_workers=total_threads) as executor:
+            futures = [executor.submit(process_shards, term, i, shards, stats)
+                       for i in range(total_threads)]
+            for future in futures:
+                future.result()
+        all_course_data = shards.merged_results()
+    else:
+        with ThreadPoolExecutor(max_workers=total_threads) as executor:
+            futures = [executor.submit(process_pages, term, i, total_threads, None, stats)
+                       for i in range(total_threads)]
+            for future in futures:
+                all_course_data.extend(future.result())
+    
+    if args.report_clicks:
+        print(f"{term.name}:")
+        stats.report()
+    
+    if writer is not None:
+        if not streamed:
+            with ttb_metrics.metrics.phase("save"):
+                writer.write(all_course_data)
+        writer.close()
+        # Upload from the file, so the courses never need to be in memory at once.
+        all_course_data = iter_courses(writer.path)
+        print(f"{term.name}: Scraping complete! {writer.count} courses saved to {writer.path}.")
+    else:
+        # Save all collected data to a JSON file locally.
+        path = f"{term.prefix}course_data.json"
+        with ttb_metrics.metrics.phase("save"), open(path, 'w') as f:
+            json.dump(all_course_data, f, indent=4, default=plain)
+        
+        print(f"{term.name}: Scraping complete! Data saved to {path}.")
+    # After the save: until then a writer only counts the pages it streamed.
+    ttb_metrics.metrics.count("courses", writer.count if writer is not None else len(all_course_data),
+                              term=term.name)
+    
+    if journal is not None:
+        # The output is saved; keep the journal only if pages are still missing.
+        if scheduler.failed:
+            journal.close()
+        else:
+            journal.remove()
+    
+    changes = None
+    if args.changes:
+        with ttb_metrics.metrics.phase("changes"):
+            current = all_course_data if writer is None else load_courses(writer.path)
+            changes = change_entry(previous, current)
+            append_entry(f"{term.prefix}changes.ndjson", changes)
+        print(f"{term.name}: Changes: {summary(changes)}")
+    
+    if uploader is None:
+        uploader = BackgroundUpload(upload_courses, args, term, all_course_data)
+    return uploader, changes
+
+def poll_terms(args, terms):
+    """Poll the terms' availability (--poll), once or every --poll-every seconds."""
+    threads = args.threads
+    if threads == "auto":
+        threads = worker_limit(max_workers=args.max_threads)
+    pollers = [AvailabilityPoller(term, f"{term.prefix}course_data.{args.output}", args.api_url, threads,
+                                  page_size=args.poll_page_size)
+               for term in terms]
+    try:
+        while True:
+            started = time.monotonic()
+            for poller in pollers:
+                delta = poller.poll()
+                print(f"{poller.term.name}: Poll: {len(delta['changed'])} changed, {len(delta['added'])} added, "
+                      f"{len(delta['removed'])} removed of {delta['sections']} sections "
+                      f"in {delta['seconds']:.1f}s -> {poller.deltas}")
+            if not args.poll_every:
+                return
+            time.sleep(max(0, args.poll_every - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for poller in pollers:
+            poller.close()
+
+def main(argv=None):
+    global EXTRACTION, EXPANSION, FILTERS, RECORDS, MEETINGS, SNAPSHOTS
+    args = parse_args(argv)
+    EXTRACTION = args.extract
+    RECORDS = args.records
+    MEETINGS = args.meetings
+    EXPANSION = args.expand
+    FILTERS = args.filters
+    if args.snapshots:
+        SNAPSHOTS = SnapshotStore(args.snapshots)
+    waits = ttb_wait.use_strategy(args.wait, args.wait_timeout)
+    POOL.max_pages = args.recycle_pages
+    POOL.max_rss_mb = args.recycle_rss
+    if args.lean:
+        profile = BrowserProfile(lean=True, blocked_resources=args.block)
+        profile.blocked_urls.extend(args.block_url)
+        POOL.launch = lambda: launch_chrome(profile)
+    terms = [TERMS[name] for name in dict.fromkeys(args.terms)]
+    if args.poll:
+        poll_terms(args, terms)
+        return
+    uploads = {}
+    changes = {}
+    errors = {}
+    try:
+        with ThreadPoolExecutor(max_workers=args.term_workers) as executor:
+            futures = {term: executor.submit(scrape_term, args, term) for term in terms}
+            for term, future in futures.items():
+                try:
+                    uploads[term], changes[term] = future.result()
+                except Exception as e:
+                    # Keep going: the other terms are still saved and uploaded.
+                    errors[term] = e
+                    print(f"{term.name}: Scraping failed:", e)
+    finally:
+        # Quit every browser, including those of workers that failed.
+        POOL.close()
+        if SNAPSHOTS is not None:
+            for term in terms:
+                SNAPSHOTS.close(term)
+    
+    if args.report_pool:
+        POOL.report()
+    if args.report_waits:
+        waits.timer.report()
+    
+    # Upload courses in chunks to Firestore, overwriting only documents from each term.
+    for term, uploader in uploads.items():
+        try:
+            upload_stats = uploader.result()
+            print(f"{term.name}:")
+            upload_stats.report()
+            print(f"{term.name}: Data uploaded to Firestore successfully in chunks!")
+            if changes[term] is not None:
+                publish_changes(term, changes[term])
+        except Exception as e:
+            print(f"{term.name}: Failed to upload data to Firestore:", e)
+    
+    if args.report_phases:
+        ttb_metrics.metrics.report()
+    if args.metrics:
+        ttb_metrics.metrics.write_json(f"{args.metrics}.json")
+        ttb_metrics.metrics.write_prometheus(f"{args.metrics}.prom")
+        print(f"Run metrics written to {args.metrics}.json and {args.metrics}.prom.")
+    
+    if errors:
+        raise next(iter(errors.values()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""start_search with a learned results URL (FILTERS = "url"), without a browser."""
+import scraper
+import ttb_wait
+from ttb_navigation import NavigationStats
+from ttb_search import SearchLinks
+from ttb_terms import TERMS
+
+TERM = TERMS["fall_winter"]
+KEY = (TERM.name, None, None)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.current_url = scraper.URL
+        self.loaded = []
+
+    def get(self, url):
+        self.loaded.append(url)
+        self.current_url = url
+
+    def execute_script(self, script, *args):
+        pass
+
+
+class FakeWait:
+    """search_results shows nothing on the learned URL and results after the form search."""
+
+    def search_results(self, driver):
+        return driver.current_url != "https://example.test/saved"
+
+
+def setup(monkeypatch, submitted=True):
+    links = SearchLinks(scraper.URL)
+    links.learn(KEY, "https://example.test/saved")
+    monkeypatch.setattr(scraper, "FILTERS", "url")
+    monkeypatch.setattr(scraper, "LINKS", links)
+    monkeypatch.setattr(ttb_wait, "strategy", FakeWait())
+    monkeypatch.setattr(scraper, "select_filters", lambda *args: None)
+    monkeypatch.setattr(scraper, "submit_search", lambda driver: submitted)
+    return links
+
+
+def test_saved_url_without_results_falls_back_to_the_form(monkeypatch):
+    links = setup(monkeypatch)
+    driver = FakeDriver()
+    stats = NavigationStats()
+
+    assert scraper.start_search(driver, TERM, 0, stats)
+
+    assert driver.loaded == ["https://example.test/saved", scraper.URL]
+    assert stats.setups == 1 and stats.linked == 0
+    # The URL that showed nothing is forgotten; the form search found no new one to learn.
+    assert links.get(KEY) is None
+
+
+def test_no_results_from_the_form_too(monkeypatch):
+    setup(monkeypatch, submitted=False)
+
+    assert not scraper.start_search(FakeDriver(), TERM, 0, NavigationStats())
@@ -0,0 +1,89 @@
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+import ttb_wait
+
+# Asynchronous JavaScript that expands every collapsed course accordion on the page in
+# one call. A MutationObserver tracks DOM changes; the callback fires once every clicked
+# course shows an expanded .accordion-body and the DOM has been quiet for quietMs
+# (or after timeoutMs). Returns {expanded, failed}.
+EXPAND_ACCORDIONS_JS = r"""
+var timeoutMs = arguments[0];
+var quietMs = arguments[1];
+var done = arguments[arguments.length - 1];
+
+function isCollapsed(button, course) {
+    var state = button.getAttribute("aria-expanded");
+    if (state !== null) {
+        return state === "false";
+    }
+    return button.classList.contains("collapsed") || !course.querySelector(".accordion-body");
+}
+
+function rendered(course) {
+    var button = course.querySelector("button.accordion-button");
+    return !!course.querySelector(".accordion-body") && !isCollapsed(button, course);
+}
+
+var lastMutation = Date.now();
+var observer = new MutationObserver(function () {
+    lastMutation = Date.now();
+});
+observer.observe(document.body, {childList: true, subtree: true, attributes: true});
+
+var pending = [];
+var failed = 0;
+var courses = document.querySelectorAll("app-course");
+for (var i = 0; i < courses.length; i++) {
+    var button = courses[i].querySelector("button.accordion-button");
+    if (!button || !isCollapsed(button, courses[i])) {
+        continue;
+    }
+    try {
+        button.click();
+        pending.push(courses[i]);
+    } catch (e) {
+        failed++;
+    }
+}
+
+var start = Date.now();
+(function check() {
+    var now = Date.now();
+    var waiting = pending.filter(function (course) { return !rendered(course); });
+    if ((waiting.length === 0 && now - lastMutation >= quietMs) || now - start >= timeoutMs) {
+        observer.disconnect();
+        done({expanded: pending.length - waiting.length, failed: failed + waiting.length});
+        return;
+    }
+    setTimeout(check, 25);
+})();
+"""
+
+
+def expand_by_clicking(driver, thread_index):
+    """Click every accordion button natively, one at a time. Returns (expanded, failed)."""
+    expanded = failed = 0
+    accordion_buttons = driver.find_elements(By.CSS_SELECTOR, "button.accordion-button")
+    for button in accordion_buttons:
+        try:
+            WebDriverWait(driver, 10).until(EC.element_to_be_clickable(button))
+            driver.execute_script("arguments[0].scrollIntoView(true);", button)
+            button.click()
+            ttb_wait.strategy.accordion_clicked(driver, button, 0.1)
+            expanded += 1
+        except Exception as e:
+            print(f"Thread {thread_index}: Error clicking accordion button: {e}")
+            failed += 1
+    return expanded, failed
+
+
+def expand_in_page(driver, timeout=10, quiet_ms=100):
+    """
+    Expand every collapsed accordion with one in-page call that returns once the
+    course bodies have rendered and the DOM has settled. Returns (expanded, failed).
+    """
+    driver.set_script_timeout(timeout + 5)
+    with ttb_wait.strategy.timer.phase("accordions"):
+        result = driver.execute_async_script(EXPAND_ACCORDIONS_JS, timeout * 1000, quiet_ms)
+    return result["expanded"], result["failed"]
@@ -0,0 +1,129 @@
+"""
+Run-to-run change feed.
+
+diff_courses() compares a term's courses with the previous run's, matching
+courses by code_title and session and their sections by code, and returns only
+what changed:
+    {"added": [course, ...],
+     "removed": [{"code_title": ..., "session": ...}, ...],
+     "modified": [{"code_title": ..., "session": ...,
+                   "fields": {field: new value, ...},
+                   "sections": {"added": [section, ...], "removed": [code, ...],
+                                "modified": {code: {field: new value, ...}}}}, ...]}
+A field that disappeared has the new value None, and empty parts are left out.
+The scraper (--changes) appends each run's diff to <prefix>changes.ndjson and
+stores the latest in the <prefix>changes document of CHANGES_COLLECTION
+(ttb_firestore). Clients that hold the version it lists as "since" can apply it
+instead of fetching every chunk document. Running this module diffs two output files:
+    python ttb_changes.py old_course_data.json course_data.json
+"""
+import json
+import hashlib
+import argparse
+import datetime
+from ttb_output import load_courses
+from ttb_records import plain
+
+
+def course_key(course):
+    return course["code_title"], course["session"]
+
+
+def diff_fields(old, new, skip=()):
+    """{field: new value} for the fields of new that differ from old (None: removed)."""
+    changed = {}
+    for field in new.keys():
+        if field not in skip and (field not in old or old[field] != new[field]):
+            changed[field] = plain(new[field])
+    for field in old.keys():
+        if field not in skip and field not in new:
+            changed[field] = None
+    return changed
+
+
+def diff_sections(old_sections, new_sections):
+    old = {section["code"]: section for section in old_sections}
+    new = {section["code"]: section for section in new_sections}
+    changes = {
+        "added": [plain(section) for code, section in new.items() if code not in old],
+        "removed": [code for code in old if code not in new],
+        "modified": {},
+    }
+    for code, section in new.items():
+        if code in old:
+            fields = diff_fields(old[code], section)
+            if fields:
+                changes["modified"][code] = fields
+    return {part: value for part, value in changes.items() if value}
+
+
+def diff_courses(previous, current):
+    """The changes from the previous courses to the current ones (see the module docstring)."""
+    old = {course_key(course): course for course in previous}
+    new = {course_key(course): course for course in current}
+    added = [plain(course) for key, course in new.items() if key not in old]
+    removed = [{"code_title": code_title, "session": session}
+               for code_title, session in old if (code_title, session) not in new]
+    modified = []
+    for key, course in new.items():
+        if key not in old:
+            continue
+        entry = {}
+        fields = diff_fields(old[key], course, skip=("sections",))
+        if fields:
+            entry["fields"] = fields
+        sections = diff_sections(old[key]["sections"], course["sections"])
+        if sections:
+            entry["sections"] = sections
+        if entry:
+            modified.append({"code_title": key[0], "session": key[1], **entry})
+    return {"added": added, "removed": removed, "modified": modified}
+
+
+def courses_digest(courses):
+    """Version of a list of courses: a hash of its content."""
+    digest = hashlib.sha1()
+    for course in courses:
+        digest.update(json.dumps(course, sort_keys=True, separators=(",", ":"), ensure_ascii=False,
+                                 default=plain).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def change_entry(previous, current):
+    """
+    One run's change-feed entry: the versions (digests) before and after and the
+    diff, or only the new version (with "full": True) when there is no previous run.
+    """
+    entry = {"run": datetime.datetime.now().isoformat(), "version": courses_digest(current)}
+    if previous is None:
+        entry.update({"since": None, "full": True})
+        return entry
+    entry.update({"since": courses_digest(previous), "full": False, "changes": diff_courses(previous, current)})
+    return entry
+
+
+def summary(entry):
+    if entry["full"]:
+        return "no previous run to compare with"
+    changes = entry["changes"]
+    return (f"{len(changes['added'])} courses added, {len(changes['removed'])} removed, "
+            f"{len(changes['modified'])} modified")
+
+
+def append_entry(path, entry):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("previous", help="the earlier course_data.json, .ndjson or .ndjson.gz")
+    parser.add_argument("current", help="the later one")
+    parser.add_argument("--indent", type=int, help="pretty-print the entry with this indent")
+    args = parser.parse_args()
+    entry = change_entry(load_courses(args.previous), load_courses(args.current))
+    print(json.dumps(entry, ensure_ascii=False, indent=args.indent))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+import ttb_metrics
+
+# Resource types the lean profile blocks by default, and the URL patterns behind each
+# type (Network.setBlockedURLs matches URLs, not types).
+BLOCKED_RESOURCES = ["image", "font", "media"]
+RESOURCE_URL_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*"],
+    "font": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.mp3*", "*.ogg*", "*.wav*"],
+    "stylesheet": ["*.css*"],
+}
+
+# Third-party analytics and tracking the scraper never needs.
+BLOCKED_URL_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*/gtag/js*", "*doubleclick.net*",
+    "*hotjar.com*", "*newrelic.com*", "*nr-data.net*", "*siteimproveanalytics*",
+]
+
+# Chrome features a headless scraper does not use.
+LEAN_ARGUMENTS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-client-side-phishing-detection",
+    "--disable-domain-reliability",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,AutofillServerCommunication",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+]
+
+# chromedriver binary, resolved once per process by webdriver-manager.
+resolved_driver_path = None
+driver_path_lock = threading.Lock()
+
+
+def driver_path():
+    """Return the chromedriver path, installing it on the first call only."""
+    global resolved_driver_path
+    with driver_path_lock:
+        if resolved_driver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            with ttb_metrics.metrics.phase("driver_install"):
+                resolved_driver_path = ChromeDriverManager().install()
+    return resolved_driver_path
+
+
+class BrowserProfile:
+    """
+    How Chrome is launched. The default profile is the original headless setup;
+    a lean profile also turns off unneeded Chrome features (LEAN_ARGUMENTS) and
+    blocks the given resource types and URL patterns through the DevTools
+    protocol, with images also disabled by preference.
+    """
+
+    def __init__(self, lean=False, blocked_resources=BLOCKED_RESOURCES, blocked_urls=BLOCKED_URL_PATTERNS):
+        self.lean = lean
+        self.blocked_resources = list(blocked_resources) if lean else []
+        self.blocked_urls = list(blocked_urls) if lean else []
+
+    def blocked_patterns(self):
+        patterns = list(self.blocked_urls)
+        for resource in self.blocked_resources:
+            patterns.extend(RESOURCE_URL_PATTERNS[resource])
+        return patterns
+
+    def options(self):
+        options = Options()
+        options.add_argument("--headless=new")  # new headless mode, more stable
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--window-size=1920,1080")
+        if self.lean:
+            for argument in LEAN_ARGUMENTS:
+                options.add_argument(argument)
+        if "image" in self.blocked_resources:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2})
+        return options
+
+    def apply(self, driver):
+        """Install the URL blocklist in a freshly launched browser."""
+        patterns = self.blocked_patterns()
+        if patterns:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+def launch_chrome(profile=None):
+    """Create a headless Chrome instance with the given profile (the default one if None)."""
+    profile = profile or BrowserProfile()
+    driver = webdriver.Chrome(service=Service(driver_path()), options=profile.options())
+    profile.apply(driver)
+    return driver
+
+
+def count_round_trips(driver):
+    """Count every WebDriver command the driver sends, per command, in ttb_metrics."""
+    execute = driver.execute
+
+    def counted(driver_command, params=None):
+        ttb_metrics.metrics.count("webdriver_commands", command=driver_command)
+        return execute(driver_command, params)
+
+    driver.execute = counted
+    return driver
+
+
+def process_tree_rss(pid):
+    """Resident memory in bytes of a process and all its descendants (None if unknown)."""
+    try:
+        import psutil
+        root = psutil.Process(pid)
+        return sum(p.memory_info().rss for p in [root] + root.children(recursive=True))
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    # Without psutil, walk /proc (Linux only).
+    children = {}
+    rss = {}
+    page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+    try:
+        entries = [entry for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return None
+    for entry in entries:
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{entry}/statm") as f:
+                rss[int(entry)] = int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total += rss.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total
+
+
+def browser_rss(driver):
+    """Resident memory of a driver's chromedriver and Chrome processes, in bytes."""
+    process = getattr(driver.service, "process", None)
+    return process_tree_rss(process.pid) if process else None
+
+
+class DriverPool:
+    """
+    Warm headless Chrome instances shared by the workers of a run and by later
+    runs in the same process. acquire() hands out an idle browser (or launches
+    one), release() returns it for reuse. A browser is recycled once it has
+    scraped max_pages pages or its processes use more than max_rss_mb MiB: quit and
+    relaunched while a worker still needs it, only quit when it is released, so
+    the next acquire() (or prewarm()) launches its replacement. Tracks launches,
+    launch time, reuses and recycles.
+    """
+
+    def __init__(self, launch=launch_chrome, max_pages=None, max_rss_mb=None):
+        self.lock = threading.Lock()
+        self.launch = launch
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.idle = []
+        self.pages = {}
+        self.launches = 0
+        self.launch_seconds = 0.0
+        self.reuses = 0
+        self.recycles = 0
+
+    def start(self):
+        start = time.perf_counter()
+        with ttb_metrics.metrics.phase("browser_launch"):
+            driver = count_round_trips(self.launch())
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.pages[driver] = 0
+            self.launches += 1
+            self.launch_seconds += elapsed
+        return driver
+
+    def prewarm(self, count):
+        """Launch browsers in parallel until count are idle."""
+        with self.lock:
+            missing = count - len(self.idle)
+        if missing <= 0:
+            return
+        with ThreadPoolExecutor(max_workers=missing) as executor:
+            drivers = list(executor.map(lambda i: self.start(), range(missing)))
+        with self.lock:
+            self.idle.extend(drivers)
+
+    def acquire(self):
+        with self.lock:
+            if self.idle:
+                self.reuses += 1
+                return self.idle.pop()
+        return self.start()
+
+    def record_page(self, driver):
+        """Count a scraped page. Returns True when the browser is due for recycling."""
+        with self.lock:
+            self.pages[driver] = self.pages.get(driver, 0) + 1
+        return self.needs_recycle(driver)
+
+    def needs_recycle(self, driver):
+        with self.lock:
+            pages = self.pages.get(driver, 0)
+        if self.max_pages and pages >= self.max_pages:
+            return True
+        if self.max_rss_mb:
+            rss = browser_rss(driver)
+            return rss is not None and rss > self.max_rss_mb * 2 ** 20
+        return False
+
+    def recycle(self, driver):
+        """Quit a browser and return a freshly launched one."""
+        self.discard(driver)
+        with self.lock:
+            self.recycles += 1
+        return self.start()
+
+    def release(self, driver):
+        """Return a browser to the pool, or quit it if it is due for recycling."""
+        if self.needs_recycle(driver):
+            self.discard(driver)
+            with self.lock:
+                self.recycles += 1
+            return
+        with self.lock:
+            self.idle.append(driver)
+
+    def discard(self, driver):
+        """Quit a browser that is broken or due for recycling."""
+        with self.lock:
+            self.pages.pop(driver, None)
+            if driver in self.idle:
+                self.idle.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close(self):
+        """Quit every browser the pool launched."""
+        with self.lock:
+            drivers = list(self.pages)
+        for driver in drivers:
+            self.discard(driver)
+
+    def report(self):
+        with self.lock:
+            per_launch = self.launch_seconds / self.launches if self.launches else 0.0
+            print(f"Driver pool: {self.launches} launches ({per_launch:.1f}s each), "
+                  f"{self.reuses} reuses, {self.recycles} recycles")
@@ -0,0 +1,449 @@
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ttb_records import Record, plain
+
+MAX_SIZE = 1048576  # 1 MiB, Firestore's maximum document size
+
+# Headroom left in every chunk so estimation slack never pushes a document over the limit.
+SAFETY_MARGIN = 8192
+
+# Fixed part of a chunk document's size: 32 bytes per document, the document name
+# (16 bytes plus each path segment + 1, allowing 128 bytes for "courses/<id>") and
+# the "courses" field name.
+DOCUMENT_OVERHEAD = 32 + 16 + 128 + len("courses") + 1
+
+# Collection holding one manifest document per program ("<PREFIX>manifest") that maps
+# each chunk document id to the hash of the courses it holds, with the ids in
+# course order under "order". While an upload is
+# writing chunks, the manifest is marked incomplete ({"chunks": {}, "complete": False}),
+# so an upload that fails partway is never trusted by the next one.
+MANIFEST_COLLECTION = "course_manifests"
+
+# Collection holding one change-feed document per program ("<PREFIX>changes", see ttb_changes).
+CHANGES_COLLECTION = "course_changes"
+
+# A batched write may hold 500 operations and a 10 MiB request; chunk documents are
+# close to 1 MiB each, so a batch is also capped by its estimated size.
+BATCH_OPERATIONS = 500
+BATCH_BYTES = 9 * MAX_SIZE
+
+
+class UploadStats:
+    """
+    Thread-safe counts of chunk documents written, left unchanged and deleted by an
+    upload, of the Firestore RPCs it made (retries included) and of its duration.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.written = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.rpcs = 0
+        self.retries = 0
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+
+    def record_rpc(self, retry=False):
+        with self.lock:
+            self.rpcs += 1
+            if retry:
+                self.retries += 1
+
+    def record_commit(self, written, deleted):
+        with self.lock:
+            self.written += written
+            self.deleted += deleted
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self.start
+        return self
+
+    def report(self):
+        with self.lock:
+            documents = self.written + self.deleted
+            per_second = documents / self.seconds if self.seconds else 0.0
+            print(f"Upload: {self.written} chunks written, {self.unchanged} unchanged, "
+                  f"{self.deleted} deleted")
+            print(f"Upload: {self.rpcs} RPCs ({self.retries} retries) in {self.seconds:.1f}s, "
+                  f"{per_second:.1f} documents/s")
+
+
+def transient(error):
+    """Whether a failed commit may succeed if retried (the service was busy or unavailable)."""
+    from google.api_core import exceptions
+    return isinstance(error, (exceptions.ServiceUnavailable, exceptions.DeadlineExceeded, exceptions.Aborted,
+                              exceptions.ResourceExhausted, exceptions.InternalServerError))
+
+
+class BatchWriter:
+    """
+    Groups document sets and deletes into batched writes and commits them from up to
+    max_workers threads. A commit that fails with a transient error is retried with
+    exponential backoff, any other error is raised at once;
+    close() waits for every batch and raises the first error that survived its retries,
+    and cancel() drops the batches not yet started (when the courses stream fails).
+    """
+
+    def __init__(self, db, stats, max_workers=4, retries=5, backoff=0.5, batch_bytes=BATCH_BYTES):
+        self.db = db
+        self.stats = stats
+        self.batch_bytes = batch_bytes
+        self.retries = retries
+        self.backoff = backoff
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.futures = []
+        self.operations = []
+        self.size = 0
+
+    def set(self, ref, data, size=0):
+        self.add(("set", ref, data), size)
+
+    def delete(self, ref):
+        self.add(("delete", ref, None), 0)
+
+    def add(self, operation, size):
+        if self.operations and (len(self.operations) >= BATCH_OPERATIONS
+                                or self.size + size > self.batch_bytes):
+            self.flush()
+        self.operations.append(operation)
+        self.size += size
+
+    def flush(self):
+        """Submit the operations collected so far as one batch."""
+        if self.operations:
+            self.futures.append(self.executor.submit(self.commit, self.operations))
+        self.operations = []
+        self.size = 0
+
+    def commit(self, operations):
+        for attempt in range(self.retries + 1):
+            batch = self.db.batch()
+            for kind, ref, data in operations:
+                if kind == "set":
+                    batch.set(ref, data)
+                else:
+                    batch.delete(ref)
+            self.stats.record_rpc(retry=attempt > 0)
+            try:
+                batch.commit()
+                break
+            except Exception as e:
+                if attempt == self.retries or not transient(e):
+                    raise
+                delay = self.backoff * 2 ** attempt
+                print(f"Batch commit failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+        self.stats.record_commit(sum(1 for kind, ref, data in operations if kind == "set"),
+                                 sum(1 for kind, ref, data in operations if kind == "delete"))
+
+    def close(self):
+        self.flush()
+        try:
+            for future in self.futures:
+                future.result()
+        finally:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def cancel(self):
+        """Drop the operations not yet committing and wait for the batches that are."""
+        self.operations = []
+        self.size = 0
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def firestore_size(value):
+    """
+    Storage size of a value as Firestore counts it against the document limit:
+    strings are their UTF-8 length + 1, numbers 8, booleans and null 1, arrays the
+    sum of their values, maps the sum of their keys and values. Records count as
+    the maps they serialize to.
+    """
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) + 1
+    if isinstance(value, bool) or value is None:
+        return 1
+    if isinstance(value, (int, float)):
+        return 8
+    if isinstance(value, (dict, Record)):
+        return sum(len(key.encode("utf-8")) + 1 + firestore_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(firestore_size(item) for item in value)
+    return len(str(value).encode("utf-8")) + 1
+
+
+def pack_chunks(courses, max_size=MAX_SIZE, margin=SAFETY_MARGIN, overhead=DOCUMENT_OVERHEAD):
+    """
+    Group courses into lists that each fit in one {"courses": [...]} document.
+    Each course is sized once and added to a running total, so packing is linear
+    in the data. A course too large for any chunk is yielded on its own.
+    """
+    budget = max_size - margin - overhead
+    chunk = []
+    chunk_size = 0
+    for course in courses:
+        size = firestore_size(course)
+        if chunk and chunk_size + size > budget:
+            yield chunk
+            chunk = []
+            chunk_size = 0
+        if size > budget:
+            print(f"Course {course.get('code_title', '?')} alone is {size} bytes, over the chunk limit")
+        chunk.append(course)
+        chunk_size += size
+    if chunk:
+        yield chunk
+
+
+def course_digest(course):
+    """Hash of a course's identity (code_title and session), the same from run to run."""
+    key = f"{course['code_title']}\x00{course['session']}"
+    return hashlib.sha1(key.encode("utf-8")).digest()
+
+
+def stable_chunks(courses, max_size=MAX_SIZE, margin=SAFETY_MARGIN, overhead=DOCUMENT_OVERHEAD):
+    """
+    Group courses, in order, into lists that each fit in one {"courses": [...]}
+    document, with boundaries that stay put from run to run. Once a chunk holds
+    a quarter of a document, it ends after any course whose identity hash falls
+    under that course's share of another quarter: a course of size bytes ends it
+    with probability size / (budget / 4), so chunks average half a document and
+    few reach the limit, where they are cut as pack_chunks would. Since a
+    boundary depends only on the course at it, an added, removed or edited
+    course changes its own chunk (and rarely the next), not every chunk after it.
+    """
+    budget = max_size - margin - overhead
+    minimum = budget // 4
+    chunk = []
+    chunk_size = 0
+    for course in courses:
+        size = firestore_size(course)
+        if chunk and chunk_size + size > budget:
+            yield chunk
+            chunk = []
+            chunk_size = 0
+        if size > budget:
+            print(f"Course {course.get('code_title', '?')} alone is {size} bytes, over the chunk limit")
+        chunk.append(course)
+        chunk_size += size
+        if chunk_size >= minimum and int.from_bytes(course_digest(course)[:8], "big") < size * 2 ** 64 // minimum:
+            yield chunk
+            chunk = []
+            chunk_size = 0
+    if chunk:
+        yield chunk
+
+
+def chunk_documents(courses, prefix):
+    """
+    Chunk courses (stable_chunks) and yield (document id, chunk) for each chunk
+    document, with records turned back into the dicts the Firestore client
+    writes. A chunk's id comes from its first course, so unchanged chunks keep
+    their ids when chunks before them are added or removed.
+    """
+    seen = set()
+    for chunk in stable_chunks(courses):
+        doc_id = f"{prefix}chunk_{course_digest(chunk[0]).hex()[:12]}"
+        suffix = 1
+        while doc_id in seen:
+            # Only if the same course starts two chunks (a duplicate in the data).
+            suffix += 1
+            doc_id = f"{prefix}chunk_{course_digest(chunk[0]).hex()[:12]}_{suffix}"
+        seen.add(doc_id)
+        yield doc_id, [plain(course) for course in chunk]
+
+
+def chunk_hash(chunk):
+    """Content hash of a chunk, independent of key order."""
+    encoded = json.dumps(chunk, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=plain)
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def prefixed_ids(collection_ref, prefix, stats):
+    """
+    Ids of the documents in the collection that belong to this program, from a
+    document-id range query that returns no document contents.
+    """
+    from google.cloud.firestore_v1.base_query import FieldFilter
+    from google.cloud.firestore_v1.field_path import FieldPath
+    document_id = FieldPath.document_id()
+    query = (collection_ref
+             .where(filter=FieldFilter(document_id, ">=", collection_ref.document(prefix)))
+             .where(filter=FieldFilter(document_id, "<", collection_ref.document(prefix + "\uf8ff")))
+             .select([document_id]))
+    stats.record_rpc()
+    return [doc.id for doc in query.stream()]
+
+
+def read_manifest(manifest_ref, stats):
+    """
+    Return {document id: hash} from the manifest, in chunk order, or None if there
+    is no manifest yet or the last upload did not finish (its chunks may not match
+    any manifest).
+    """
+    stats.record_rpc()
+    snapshot = manifest_ref.get()
+    if not snapshot.exists:
+        return None
+    manifest = snapshot.to_dict() or {}
+    if manifest.get("complete") is False:
+        return None
+    chunks = manifest.get("chunks", {})
+    # Manifests from before "order" was stored have numbered ids (chunk_1, chunk_2, ...).
+    order = manifest.get("order") or sorted(chunks, key=lambda doc_id: int(doc_id.rsplit("_", 1)[1]))
+    return {doc_id: chunks[doc_id] for doc_id in order}
+
+
+def write_manifest(manifest_ref, manifest, stats):
+    stats.record_rpc()
+    manifest_ref.set({"chunks": manifest, "order": list(manifest), "complete": True})
+
+
+def mark_incomplete(manifest_ref, stats):
+    """Mark the manifest incomplete before the first chunk is written or deleted."""
+    stats.record_rpc()
+    manifest_ref.set({"chunks": {}, "complete": False})
+
+
+def replace_chunks(db, collection_ref, manifest_ref, prefix, courses, max_workers=4,
+                   batch_bytes=BATCH_BYTES, eager=False):
+    """
+    Delete every document of this program, then write every chunk (the original upload).
+    courses may be a stream; chunks are committed as they fill up. Since the
+    deletes come first, a stream that fails leaves only the chunks written so
+    far, so the scraper does not pipeline this mode. eager is as for sync_chunks.
+    """
+    stats = UploadStats()
+    mark_incomplete(manifest_ref, stats)
+    writer = BatchWriter(db, stats, max_workers)
+    for doc_id in prefixed_ids(collection_ref, prefix, stats):
+        writer.delete(collection_ref.document(doc_id))
+    # Deletes go in their own batches, committed before any chunk is rewritten.
+    writer.close()
+    writer = BatchWriter(db, stats, max_workers, batch_bytes=batch_bytes)
+    manifest = {}
+    try:
+        for doc_id, chunk in chunk_documents(courses, prefix):
+            writer.set(collection_ref.document(doc_id), {"courses": chunk}, firestore_size(chunk))
+            if eager:
+                writer.flush()
+            manifest[doc_id] = chunk_hash(chunk)
+    except BaseException:
+        writer.cancel()
+        raise
+    writer.close()
+    write_manifest(manifest_ref, manifest, stats)
+    return stats.finish()
+
+
+def sync_chunks(db, collection_ref, manifest_ref, prefix, courses, max_workers=4,
+                batch_bytes=BATCH_BYTES, eager=False):
+    """
+    Write only the chunks whose hash differs from the manifest, delete the chunk
+    documents that are no longer produced, then store the new manifest.
+    Without a complete manifest (first sync, or the last upload failed), every
+    chunk is written and orphans are found with a document-id query. courses may
+    be a stream; chunks are committed as batches fill up or, with eager (a
+    stream still being scraped), each as soon as it is packed. The manifest is marked
+    incomplete before the first write and only stored again once every write
+    has been committed.
+
+    Chunk boundaries and ids are stable (chunk_documents), so a run writes one
+    chunk per chunk that holds a change: an inserted or removed course costs
+    about one write, not a rewrite of every chunk after it.
+    """
+    stats = UploadStats()
+    old_manifest = read_manifest(manifest_ref, stats)
+    if old_manifest is None:
+        existing = prefixed_ids(collection_ref, prefix, stats)
+        old_manifest = {}
+    else:
+        existing = list(old_manifest)
+    writer = BatchWriter(db, stats, max_workers, batch_bytes=batch_bytes)
+    manifest = {}
+    marked = False
+    try:
+        for doc_id, chunk in chunk_documents(courses, prefix):
+            manifest[doc_id] = chunk_hash(chunk)
+            if old_manifest.get(doc_id) == manifest[doc_id]:
+                stats.unchanged += 1
+                continue
+            if not marked:
+                mark_incomplete(manifest_ref, stats)
+                marked = True
+            writer.set(collection_ref.document(doc_id), {"courses": chunk}, firestore_size(chunk))
+            if eager:
+                writer.flush()
+    except BaseException:
+        # The courses stream failed (the scrape behind --pipeline): commit nothing more.
+        writer.cancel()
+        raise
+    orphans = [doc_id for doc_id in existing if doc_id not in manifest]
+    if orphans and not marked:
+        mark_incomplete(manifest_ref, stats)
+    for doc_id in orphans:
+        writer.delete(collection_ref.document(doc_id))
+    writer.close()
+    write_manifest(manifest_ref, manifest, stats)
+    return stats.finish()
+
+
+def stored_courses(collection_ref, manifest_ref):
+    """
+    The courses of this program's chunk documents, in chunk order, as the last
+    upload left them; None if nothing has been uploaded (no manifest).
+    """
+    stats = UploadStats()
+    manifest = read_manifest(manifest_ref, stats)
+    if manifest is None:
+        return None
+    courses = []
+    for doc_id in manifest:
+        snapshot = collection_ref.document(doc_id).get()
+        courses.extend((snapshot.to_dict() or {}).get("courses", []))
+    return courses
+
+
+def write_changes(changes_ref, entry, max_size=MAX_SIZE, margin=SAFETY_MARGIN, overhead=DOCUMENT_OVERHEAD):
+    """
+    Store a change-feed entry as the program's changes document. An entry too
+    large for one document is stored without its changes and with "full": True,
+    telling clients to fetch the chunks. Returns what was stored.
+    """
+    if not entry["full"] and firestore_size(entry) > max_size - margin - overhead:
+        entry = {key: value for key, value in entry.items() if key != "changes"}
+        entry["full"] = True
+    changes_ref.set(entry)
+    return entry
+
+
+class BackgroundUpload:
+    """
+    Runs upload(*args) in a background thread, typically over a stream of courses
+    that is still being scraped. result() waits for it and returns its stats or
+    raises its error.
+    """
+
+    def __init__(self, upload, *args):
+        self.stats = None
+        self.error = None
+        self.thread = threading.Thread(target=self.run, args=(upload, args), daemon=True)
+        self.thread.start()
+
+    def run(self, upload, args):
+        try:
+            self.stats = upload(*args)
+        except BaseException as e:
+            self.error = e
+
+    def wait(self):
+        self.thread.join()
+
+    def result(self):
+        self.wait()
+        if self.error is not None:
+            raise self.error
+        return self.stats
@@ -0,0 +1,229 @@
+import os
+import json
+import math
+import datetime
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup
+
+# JSON backend used by the ttb.utoronto.ca Angular app.
+API_URL = "https://api.easi.utoronto.ca/ttb/"
+COURSES_ENDPOINT = "getPageableCourses"
+PAGE_SIZE = 20
+
+# Division codes behind the search page's division options.
+DIVISIONS = ["APSC", "ARCLA", "ARTSC", "FPEH", "MUSIC", "SGS", "UTM", "UTSC"]
+
+DAYS = {1: "Monday", 2: "Tuesday", 3: "Wednesday", 4: "Thursday", 5: "Friday",
+        6: "Saturday", 7: "Sunday"}
+SEASONS = {"1": "Winter", "5": "Summer", "9": "Fall"}
+DELIVERY_MODES = {"INPER": "In Person", "SYNC": "Online - Synchronous",
+                  "ASYNC": "Online - Asynchronous", "HYBR": "Hybrid"}
+ENROLMENT_CONTROLS_TEXT = "Enrolment Controls exist for this section.See details"
+
+
+def term_sessions(term, today=None):
+    """
+    Session codes (YYYYM, M = 9 fall, 1 winter, 5 summer) for a term:
+    "fall_winter" is the current academic year, "next_fall_winter" the one after,
+    "summer" the coming (or current) summer.
+    """
+    today = today or datetime.date.today()
+    year = today.year if today.month >= 5 else today.year - 1
+    if term == "summer":
+        summer = today.year if today.month < 9 else today.year + 1
+        return [f"{summer}5F", f"{summer}5S", f"{summer}5"]
+    if term == "next_fall_winter":
+        year += 1
+    return [f"{year}9", f"{year + 1}1", f"{year}9-{year + 1}1"]
+
+
+def session_name(code):
+    """Display name for a session code, e.g. "20259-20261" -> "2025 Fall - 2026 Winter (Y)"."""
+    if "-" in code:
+        first, last = code.split("-")
+        return f"{first[:4]} {SEASONS[first[4]]} - {last[:4]} {SEASONS[last[4]]} (Y)"
+    year, season, part = code[:4], SEASONS[code[4]], code[5:]
+    if season == "Summer":
+        return f"{year} {season} ({part or 'Y'})"
+    return f"{year} {season} ({'F' if season == 'Fall' else 'S'})"
+
+
+def search_body(divisions, sessions, page, page_size=PAGE_SIZE):
+    """Request body the search page sends for one results page."""
+    return {
+        "courseCodeAndTitleProps": {"courseCode": "", "courseTitle": "", "courseSectionCode": ""},
+        "departmentProps": [],
+        "campuses": [],
+        "sessions": sessions,
+        "requirementProps": [],
+        "instructor": "",
+        "courseLevels": [],
+        "deliveryModes": [],
+        "dayPreferences": [],
+        "timePreferences": [],
+        "divisions": divisions,
+        "creditWeights": [],
+        "page": page,
+        "pageSize": page_size,
+        "direction": "asc",
+    }
+
+
+def recording_key(endpoint, body):
+    """File name a response is recorded under: hash of the request without its page, plus the page."""
+    query = {key: value for key, value in body.items() if key != "page"}
+    digest = hashlib.sha1((endpoint + json.dumps(query, sort_keys=True)).encode("utf-8")).hexdigest()
+    return f"{endpoint}_{digest[:16]}_p{body.get('page', 1)}.json"
+
+
+def text(html):
+    """Text of an HTML fragment, the way the results page parser reads it."""
+    return BeautifulSoup(html, "html.parser").get_text(strip=True)
+
+
+def clock(millis):
+    minutes = millis // 60000
+    return f"{minutes // 60}:{minutes % 60:02d}"
+
+
+def section_availability(section):
+    """The availability and waitlist texts of an API section, as the results page shows them."""
+    max_enrolment = section.get("maxEnrolment") or 0
+    return (f"{max_enrolment - (section.get('currentEnrolment') or 0)} of {max_enrolment}",
+            f"{section.get('currentWaitlist') or 0} students")
+
+
+def section_record(section):
+    """Convert an API section to the section dict produced by the results page parser."""
+    meetings = section.get("meetingTimes") or []
+    day_time = "".join(
+        f"{DAYS[m['start']['day']]}{clock(m['start']['millisofday'])} - {clock(m['end']['millisofday'])}"
+        for m in meetings
+    )
+    locations = []
+    for m in meetings:
+        building = m.get("building") or {}
+        if building.get("buildingCode"):
+            location = f"{building['buildingCode']} {building.get('buildingRoomNumber', '')}".strip()
+            if location not in locations:
+                locations.append(location)
+    instructors = "".join(f"{i['lastName']}, {i['firstName']}" for i in section.get("instructors") or [])
+    modes = [DELIVERY_MODES.get(m["mode"], m["mode"]) for m in section.get("deliveryModes") or []]
+    availability, waitlist = section_availability(section)
+    return {
+        "code": section.get("name", "N/A"),
+        "day_time": day_time or "N/A",
+        "location": "".join(locations) or "TBA",
+        "instructor": instructors or "—",
+        "availability": availability,
+        "waitlist": waitlist,
+        "enrollment_control": ENROLMENT_CONTROLS_TEXT if section.get("enrolmentControls") else "N/A",
+        "delivery_mode": "".join(modes) or "N/A",
+    }
+
+
+def course_identity(course):
+    """(code_title, session) of an API course, as the results page shows them."""
+    sessions = course.get("sessions") or []
+    return f"{course['code']} - {course['name']}", session_name("-".join(sessions)) if sessions else "N/A"
+
+
+def course_record(course):
+    """Convert an API course to the course dict produced by the results page parser."""
+    notes = "".join(text(note["content"]) for note in course.get("notes") or [])
+    code_title, session = course_identity(course)
+    return {
+        "code_title": code_title,
+        "campus": course.get("campus") or "N/A",
+        "session": session,
+        "notes": notes or "N/A",
+        "sections": [section_record(section) for section in course.get("sections") or []],
+    }
+
+
+class TimetableClient:
+    """
+    Keep-alive HTTP client for the timetable backend.
+    One pooled session is shared by up to max_workers concurrent requests;
+    transient failures are retried with backoff. With record_dir, every response
+    is also saved there for the replay server (benchmarks/replay_server.py).
+    With adapt_page_size, a backend that serves the first page at another page
+    size than requested (e.g. capped) sets page_size for the remaining pages.
+    """
+
+    def __init__(self, base_url=API_URL, max_workers=8, timeout=30, page_size=PAGE_SIZE,
+                 record_dir=None, adapt_page_size=False):
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.page_size = page_size
+        self.adapt_page_size = adapt_page_size
+        self.record_dir = record_dir
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=None)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+
+    def fetch_page(self, divisions, sessions, page):
+        """Return (API courses, total course count) for one results page."""
+        page_size = self.page_size
+        body = search_body(divisions, sessions, page, page_size)
+        response = self.session.post(self.base_url + COURSES_ENDPOINT, json=body, timeout=self.timeout)
+        with self.lock:
+            self.requests += 1
+        response.raise_for_status()
+        if self.record_dir:
+            os.makedirs(self.record_dir, exist_ok=True)
+            with open(os.path.join(self.record_dir, recording_key(COURSES_ENDPOINT, body)), "wb") as f:
+                f.write(response.content)
+        pageable = response.json()["payload"]["pageableCourse"]
+        served = pageable.get("pageSize", page_size)
+        if served != page_size:
+            if not (self.adapt_page_size and page == 1):
+                # Pages of another size would be numbered differently: courses would be missed.
+                raise ValueError(f"the backend returned pages of {served} courses, "
+                                 f"not the {page_size} requested")
+            with self.lock:
+                self.page_size = served
+        return pageable["courses"], pageable["total"]
+
+    def fetch_courses(self, divisions, sessions, expected_pages=1):
+        """
+        Fetch every results page and return the API courses in page order.
+        The first expected_pages (known from an earlier run) are requested at
+        once; the rest once the first page has given the total. Expected pages
+        past the total (the term shrank) are dropped, failed or not, and so are
+        all of them when the first page set another page size (adapt_page_size).
+        """
+        requested = self.page_size
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.fetch_page, divisions, sessions, page)
+                       for page in range(1, max(1, expected_pages) + 1)]
+            first_page, total = futures[0].result()
+            if self.page_size != requested:
+                for future in futures[1:]:
+                    future.cancel()
+                futures = futures[:1]
+            total_pages = max(1, math.ceil(total / self.page_size))
+            pages = [first_page] + [future.result()[0] for future in futures[1:total_pages]]
+            futures = [executor.submit(self.fetch_page, divisions, sessions, page)
+                       for page in range(len(pages) + 1, total_pages + 1)]
+            pages.extend(future.result()[0] for future in futures)
+        return [course for courses in pages for course in courses]
+
+    def fetch_all(self, divisions, sessions):
+        """Fetch every results page and return the course records in page order."""
+        return [course_record(course) for course in self.fetch_courses(divisions, sessions)]
+
+    def close(self):
+        self.session.close()
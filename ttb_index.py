@@ -0,0 +1,312 @@
+"""
+Indexed queries over scraped courses.
+
+CourseIndex loads a course_data file (or takes a list of courses) and builds
+hash indexes from each key of FIELDS (course code, campus, session, instructor,
+delivery mode; case-insensitive) to the courses that have it, plus a sorted
+index of the code_titles for prefix search. query() combines filters (AND across
+fields, OR across the values given for one field) and pages through the
+matches in output order.
+
+write_index() saves the same indexes, and the courses, to one file laid out as
+flat arrays; MappedIndex memory-maps it and answers the same queries by binary
+search over the file, decoding only the courses it returns, so opening it
+costs almost nothing whatever the size of the term:
+    python ttb_index.py fall_winter_course_data.json --save fall_winter.idx
+    python ttb_index.py fall_winter.idx --prefix CSC1 --campus "St. George" --limit 5
+"""
+import re
+import sys
+import json
+import mmap
+import array
+import bisect
+import struct
+import argparse
+from ttb_output import load_courses
+from ttb_records import plain
+from ttb_schedule import course_code
+
+# A section lists its instructors run together ("Liu, J.Patel, R."); a new name
+# starts where a capitalized word followed by ", " comes right after a letter or period.
+INSTRUCTOR_BOUNDARY = re.compile(r"(?<=[a-z.])(?=[A-Z][^,\s]*, )")
+
+
+def split_instructors(text):
+    """
+    The names in a section's instructor text. A piece with no comma (the "Mc" of
+    "McDonald, A.") belongs to the name after it.
+    """
+    names = []
+    carry = ""
+    for piece in INSTRUCTOR_BOUNDARY.split(text):
+        if ", " not in piece:
+            carry += piece
+            continue
+        names.append(carry + piece)
+        carry = ""
+    if carry:
+        names.append(carry)
+    return names
+
+
+def section_values(course, key):
+    values = set()
+    for section in course["sections"]:
+        value = section.get(key)
+        if not value:
+            continue
+        if key == "instructor":
+            values.update(split_instructors(value))
+        else:
+            values.add(value)
+    return values
+
+
+# Indexed fields: each maps a course to the values it is found under.
+FIELDS = {
+    "code": lambda course: {course_code(course)},
+    "campus": lambda course: {course["campus"]},
+    "session": lambda course: {course["session"]},
+    "instructor": lambda course: section_values(course, "instructor"),
+    "delivery_mode": lambda course: section_values(course, "delivery_mode"),
+}
+
+
+def normalize(value):
+    return value.casefold()
+
+
+class CourseLookup:
+    """Queries shared by CourseIndex and MappedIndex, over their lookup() and lookup_prefix()."""
+
+    def query(self, offset=0, limit=20, prefix=None, **filters):
+        """
+        Courses matching every filter, in output order: returns (total, courses)
+        with courses the page of at most limit matches starting at offset.
+        filters are FIELDS keys, each a value or a list of values (any of them);
+        prefix matches the start of code_title.
+        """
+        matches = None
+        for field, values in filters.items():
+            if field not in FIELDS:
+                raise TypeError(f"unknown filter {field!r}")
+            if values is None:
+                continue
+            if isinstance(values, str):
+                values = [values]
+            ids = set()
+            for value in values:
+                ids.update(self.lookup(field, value))
+            matches = ids if matches is None else matches & ids
+        if prefix is not None:
+            ids = set(self.lookup_prefix(prefix))
+            matches = ids if matches is None else matches & ids
+        if matches is None:
+            total = len(self)
+            page = range(offset, min(offset + limit, total))
+        else:
+            total = len(matches)
+            page = sorted(matches)[offset:offset + limit]
+        return total, [self.course(i) for i in page]
+
+    def get(self, code):
+        """Every course (one per session offered) with this course code."""
+        return [self.course(i) for i in self.lookup("code", code)]
+
+
+class CourseIndex(CourseLookup):
+    """In-memory indexes over courses (dicts or records), built on creation."""
+
+    def __init__(self, courses):
+        self.courses = courses
+        self.indexes = {field: {} for field in FIELDS}
+        for i, course in enumerate(courses):
+            for field, values_of in FIELDS.items():
+                index = self.indexes[field]
+                for value in values_of(course):
+                    index.setdefault(normalize(value), []).append(i)
+        titles = sorted((normalize(course["code_title"]), i) for i, course in enumerate(courses))
+        self.titles = [title for title, i in titles]
+        self.title_ids = [i for title, i in titles]
+
+    @classmethod
+    def load(cls, path):
+        return cls(load_courses(path))
+
+    def __len__(self):
+        return len(self.courses)
+
+    def course(self, i):
+        return self.courses[i]
+
+    def lookup(self, field, value):
+        return self.indexes[field].get(normalize(value), [])
+
+    def lookup_prefix(self, prefix):
+        prefix = normalize(prefix)
+        start = bisect.bisect_left(self.titles, prefix)
+        end = start
+        while end < len(self.titles) and self.titles[end].startswith(prefix):
+            end += 1
+        return self.title_ids[start:end]
+
+
+# Index file: MAGIC, the length of a JSON header, the header, then 8-byte aligned
+# arrays in native byte order. The header maps each array's name to its [offset,
+# length] in bytes. A string table "name" is two arrays: "name.offsets" (count + 1
+# uint64 offsets into "name.data") and "name.data" (the UTF-8 strings end to end).
+MAGIC = b"TTBIDX1\n"
+
+
+def string_table(strings):
+    offsets = array.array("Q", [0])
+    data = bytearray()
+    for string in strings:
+        data += string.encode("utf-8")
+        offsets.append(len(data))
+    return offsets.tobytes(), bytes(data)
+
+
+def write_index(courses, path):
+    """Build the indexes over courses and save them, with the courses, to path."""
+    index = courses if isinstance(courses, CourseIndex) else CourseIndex(courses)
+    arrays = {}
+    arrays["courses.offsets"], arrays["courses.data"] = string_table(
+        json.dumps(course, default=plain) for course in index.courses)
+    arrays["titles.offsets"], arrays["titles.data"] = string_table(index.titles)
+    arrays["titles.ids"] = array.array("I", index.title_ids).tobytes()
+    for field, postings in index.indexes.items():
+        keys = sorted(postings)
+        arrays[f"{field}.keys.offsets"], arrays[f"{field}.keys.data"] = string_table(keys)
+        starts = array.array("I", [0])
+        ids = array.array("I")
+        for key in keys:
+            ids.extend(postings[key])
+            starts.append(len(ids))
+        arrays[f"{field}.starts"] = starts.tobytes()
+        arrays[f"{field}.ids"] = ids.tobytes()
+
+    layout = {}
+    position = 0
+    for name, data in arrays.items():
+        layout[name] = [position, len(data)]
+        position += -(-len(data) // 8) * 8
+    header = json.dumps({"count": len(index), "byteorder": sys.byteorder, "arrays": layout}).encode("utf-8")
+    start = -(-(len(MAGIC) + 8 + len(header)) // 8) * 8
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+        f.write(b"\0" * (start - f.tell()))
+        for name, data in arrays.items():
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    return len(index)
+
+
+class MappedIndex(CourseLookup):
+    """The indexes of a file written by write_index(), memory-mapped; courses are decoded on access."""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a course index")
+        (length,) = struct.unpack_from("<Q", self.map, len(MAGIC))
+        header = json.loads(self.map[len(MAGIC) + 8:len(MAGIC) + 8 + length])
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was written on a {header['byteorder']}-endian machine; rebuild it")
+        self.count = header["count"]
+        self.layout = header["arrays"]
+        self.start = -(-(len(MAGIC) + 8 + length) // 8) * 8
+        self.view = memoryview(self.map)
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def raw(self, name):
+        offset, length = self.layout[name]
+        return self.view[self.start + offset:self.start + offset + length]
+
+    def numbers(self, name, code):
+        return self.raw(name).cast(code)
+
+    def string(self, table, i):
+        offsets = self.numbers(f"{table}.offsets", "Q")
+        return bytes(self.raw(f"{table}.data")[offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def search(self, table, key, count):
+        """Position of the first string in a sorted table that is not below key."""
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if self.string(table, middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def __len__(self):
+        return self.count
+
+    def course(self, i):
+        return json.loads(self.string("courses", i))
+
+    def lookup(self, field, value):
+        key = normalize(value)
+        count = len(self.numbers(f"{field}.starts", "I")) - 1
+        position = self.search(f"{field}.keys", key, count)
+        if position == count or self.string(f"{field}.keys", position) != key:
+            return []
+        starts = self.numbers(f"{field}.starts", "I")
+        return self.numbers(f"{field}.ids", "I")[starts[position]:starts[position + 1]].tolist()
+
+    def lookup_prefix(self, prefix):
+        prefix = normalize(prefix)
+        start = end = self.search("titles", prefix, self.count)
+        while end < self.count and self.string("titles", end).startswith(prefix):
+            end += 1
+        return self.numbers("titles.ids", "I")[start:end].tolist()
+
+
+def open_index(path):
+    """A MappedIndex for an index file (.idx), otherwise a CourseIndex over a course_data file."""
+    if path.endswith(".idx"):
+        return MappedIndex(path)
+    return CourseIndex.load(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="course_data.json, .ndjson(.gz), or an index file (.idx)")
+    parser.add_argument("--save", metavar="PATH", help="write the index of source to PATH (.idx) and exit")
+    parser.add_argument("--prefix", help="code_title prefix, e.g. CSC1")
+    for field in FIELDS:
+        parser.add_argument(f"--{field.replace('_', '-')}", dest=field, action="append",
+                            help=f"{field.replace('_', ' ')} (repeat for any of several)")
+    parser.add_argument("--offset", type=int, default=0, help="matches to skip (default: 0)")
+    parser.add_argument("--limit", type=int, default=20, help="matches to list (default: 20)")
+    args = parser.parse_args()
+
+    if args.save:
+        count = write_index(load_courses(args.source), args.save)
+        print(f"Indexed {count} courses into {args.save}.")
+        return
+    index = open_index(args.source)
+    total, courses = index.query(args.offset, args.limit, args.prefix,
+                                 **{field: getattr(args, field) for field in FIELDS})
+    for course in courses:
+        print(f"{course['code_title']}  [{course['campus']}, {course['session']}, "
+              f"{len(course['sections'])} sections]")
+    print(f"{total} matching courses; showing {len(courses)} from {args.offset}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import os
+import json
+import datetime
+import threading
+from ttb_records import plain
+
+
+class PageJournal:
+    """
+    Append-only record of the results pages a run has completed: one JSON line per
+    page with its number and courses, flushed as soon as the page is done.
+    With resume, the pages of an earlier, interrupted run are loaded into pages
+    (a line cut off by a crash is dropped) and carried over into the new journal.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.lock = threading.Lock()
+        self.pages = self.load() if resume else {}
+        self.file = open(path, "w", encoding="utf-8")
+        self.file.write(json.dumps({"started": datetime.datetime.now().isoformat()}) + "\n")
+        for page in sorted(self.pages):
+            self.file.write(json.dumps({"page": page, "courses": self.pages[page]}, default=plain) + "\n")
+        self.file.flush()
+
+    def load(self):
+        pages = {}
+        if not os.path.exists(self.path):
+            return pages
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if "page" in entry:
+                    pages[entry["page"]] = entry["courses"]
+        return pages
+
+    def record(self, page, page_data):
+        with self.lock:
+            self.file.write(json.dumps({"page": page, "courses": page_data}, default=plain) + "\n")
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    def remove(self):
+        """Delete the journal once the run's output has been saved."""
+        self.close()
+        os.remove(self.path)
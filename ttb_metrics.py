@@ -0,0 +1,164 @@
+"""
+Run instrumentation: phase timers, counters and per-page latencies.
+
+The helpers record into the module-level `metrics`, the way they use
+ttb_wait.strategy. At the end of a run the scraper writes it as a JSON report
+and as a Prometheus text-format file (for the node_exporter textfile collector):
+    metrics.write_json("run_metrics.json")
+    metrics.write_prometheus("run_metrics.prom")
+"""
+import json
+import time
+import datetime
+import threading
+from contextlib import contextmanager
+
+# Prometheus metric names are prefixed with this.
+NAMESPACE = "ttb"
+
+# Quantiles of the per-page latency reported in both formats.
+QUANTILES = [0.5, 0.9, 0.99]
+
+
+def quantile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def prometheus_labels(labels):
+    if not labels:
+        return ""
+
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+
+class RunMetrics:
+    """
+    Thread-safe timers and counters for one run.
+    phase(name) times a block (count, total and max seconds per phase);
+    count(name, amount, **labels) adds to a counter; record_page(...) keeps the
+    latency of every scraped page with the term and worker that scraped it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.counters = {}
+        self.pages = []
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                count, seconds, longest = self.phases.get(name, (0, 0.0, 0.0))
+                self.phases[name] = (count + 1, seconds + elapsed, max(longest, elapsed))
+
+    def count(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def record_page(self, term, worker, page, seconds, courses):
+        with self.lock:
+            self.pages.append({"term": term, "worker": worker, "page": page,
+                               "seconds": seconds, "courses": courses})
+
+    def workers(self):
+        """Pages, total and max page seconds per (term, worker)."""
+        totals = {}
+        for entry in self.pages:
+            key = (entry["term"], entry["worker"])
+            pages, seconds, longest = totals.get(key, (0, 0.0, 0.0))
+            totals[key] = (pages + 1, seconds + entry["seconds"], max(longest, entry["seconds"]))
+        return totals
+
+    def to_dict(self):
+        with self.lock:
+            latencies = sorted(entry["seconds"] for entry in self.pages)
+            return {
+                "started": datetime.datetime.fromtimestamp(self.started).isoformat(),
+                "seconds": time.perf_counter() - self.start,
+                "phases": {name: {"count": count, "seconds": seconds, "max_seconds": longest}
+                           for name, (count, seconds, longest) in sorted(self.phases.items())},
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                "page_seconds": {
+                    "count": len(latencies),
+                    "sum": sum(latencies),
+                    **{f"p{int(q * 100)}": quantile(latencies, q) for q in QUANTILES},
+                },
+                "workers": [{"term": term, "worker": worker, "pages": pages,
+                             "seconds": seconds, "max_seconds": longest}
+                            for (term, worker), (pages, seconds, longest)
+                            in sorted(self.workers().items())],
+                "pages": list(self.pages),
+            }
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+    def write_prometheus(self, path):
+        report = self.to_dict()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {NAMESPACE}_{name} {help_text}")
+            lines.append(f"# TYPE {NAMESPACE}_{name} {kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{NAMESPACE}_{name}{suffix}{prometheus_labels(labels)} {value}")
+
+        metric("run_seconds", "gauge", "Wall time of the run.",
+               [("", (), report["seconds"])])
+        metric("run_started_timestamp_seconds", "gauge", "Start of the run (Unix time).",
+               [("", (), self.started)])
+        phases = report["phases"]
+        metric("phase_seconds_total", "counter", "Time spent in each phase.",
+               [("", (("phase", name),), phase["seconds"]) for name, phase in phases.items()])
+        metric("phase_calls_total", "counter", "Times each phase ran.",
+               [("", (("phase", name),), phase["count"]) for name, phase in phases.items()])
+        metric("phase_max_seconds", "gauge", "Longest single run of each phase.",
+               [("", (("phase", name),), phase["max_seconds"]) for name, phase in phases.items()])
+        latency = report["page_seconds"]
+        metric("page_seconds", "summary", "Time to reach, expand and parse one results page.",
+               [("", (("quantile", str(q)),), latency[f"p{int(q * 100)}"]) for q in QUANTILES]
+               + [("_sum", (), latency["sum"]), ("_count", (), latency["count"])])
+        workers = report["workers"]
+        metric("worker_pages_total", "counter", "Results pages scraped per worker.",
+               [("", (("term", w["term"]), ("worker", w["worker"])), w["pages"]) for w in workers])
+        metric("worker_page_seconds_total", "counter", "Time spent on results pages per worker.",
+               [("", (("term", w["term"]), ("worker", w["worker"])), w["seconds"]) for w in workers])
+        counters = {}
+        for counter in report["counters"]:
+            counters.setdefault(counter["name"], []).append(counter)
+        for name, samples in counters.items():
+            metric(f"{name}_total", "counter", f"Total {name.replace('_', ' ')}.",
+                   [("", tuple(sorted(c["labels"].items())), c["value"]) for c in samples])
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def report(self):
+        """Print the time per phase and the per-page latency."""
+        report = self.to_dict()
+        print(f"Run: {report['seconds']:.1f}s")
+        for name, phase in report["phases"].items():
+            print(f"Phase ({name}): {phase['seconds']:.1f}s over {phase['count']} calls "
+                  f"(max {phase['max_seconds']:.2f}s)")
+        latency = report["page_seconds"]
+        if latency["count"]:
+            print(f"Pages: {latency['count']}, p50 {latency['p50']:.2f}s, "
+                  f"p90 {latency['p90']:.2f}s, p99 {latency['p99']:.2f}s")
+
+
+# The metrics the scraper and its helpers record into.
+metrics = RunMetrics()
@@ -0,0 +1,330 @@
+import queue
+import threading
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import StaleElementReferenceException
+import ttb_wait
+
+# XPath for an enabled 'Next' link in the results pagination.
+NEXT_LINK_XPATH = (
+    "//a[contains(@class, 'page-link') and normalize-space()='Next' "
+    "and not(ancestor::li[contains(@class, 'disabled')])]"
+)
+
+# Numbered page links, the active page and the (optional) page-number input.
+PAGE_LINK_CSS = "ul.pagination li.page-item a.page-link"
+ACTIVE_PAGE_CSS = "ul.pagination li.page-item.active"
+PAGE_INPUT_CSS = "ul.pagination input"
+
+
+class NavigationStats:
+    """
+    Thread-safe counters for pagination clicks, scraped pages, expanded accordions
+    and the time spent setting up search filters.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clicks = 0
+        self.pages = 0
+        self.expanded = 0
+        self.expand_failed = 0
+        self.setups = 0
+        self.linked = 0
+        self.setup_seconds = 0.0
+
+    def record_click(self, count=1):
+        with self.lock:
+            self.clicks += count
+
+    def record_page(self):
+        with self.lock:
+            self.pages += 1
+
+    def record_expansion(self, expanded, failed):
+        with self.lock:
+            self.expanded += expanded
+            self.expand_failed += failed
+
+    def record_setup(self, seconds, linked=False):
+        """Count one filter setup; linked when a learned results URL was loaded instead."""
+        with self.lock:
+            self.setups += 1
+            self.linked += linked
+            self.setup_seconds += seconds
+
+    def report(self):
+        with self.lock:
+            per_page = self.clicks / self.pages if self.pages else 0.0
+            print(f"Navigation: {self.clicks} clicks for {self.pages} pages "
+                  f"({per_page:.2f} clicks per scraped page)")
+            print(f"Accordions: {self.expanded} expanded, {self.expand_failed} failed")
+            per_setup = self.setup_seconds / self.setups if self.setups else 0.0
+            print(f"Filter setup: {self.setup_seconds:.1f}s over {self.setups} searches "
+                  f"({per_setup:.2f}s each, {self.linked} from a learned URL)")
+
+
+class PageStream:
+    """
+    Iterator over the courses of the pages a PageScheduler emits, in page order.
+    Ends when the scheduler is closed, or raises the error it was closed with.
+    """
+
+    def __init__(self):
+        self.pages = queue.Queue()
+
+    def __call__(self, page_data):
+        self.pages.put(page_data)
+
+    def close(self, error=None):
+        self.pages.put(error)
+
+    def __iter__(self):
+        while True:
+            page_data = self.pages.get()
+            if page_data is None:
+                return
+            if isinstance(page_data, BaseException):
+                raise page_data
+            yield from page_data
+
+
+class PageScheduler:
+    """
+    Shared work queue of results page numbers.
+    The first worker to reach the results fills the queue from the pagination;
+    every worker then pulls page numbers until the queue is empty and no worker
+    is still on the last known page (which may show that there are more).
+    Completed pages are emitted to the sinks in page order, each as soon as every
+    earlier page has been scraped or has failed. With keep_results they are also
+    kept by page number for ordered_results; otherwise they are dropped once emitted.
+    With a journal, every completed page is recorded there; pages restored from an
+    earlier run's journal are not queued again.
+    """
+
+    def __init__(self, keep_results=True, journal=None):
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.pages = queue.Queue()
+        self.total_pages = None
+        self.in_progress = set()
+        self.keep_results = keep_results
+        self.journal = journal
+        self.done = set()
+        self.results = {}
+        self.pending = {}
+        self.failed = []
+        self.next_emit = 1
+        self.sinks = []
+        self.streams = []
+
+    def populate(self, total_pages):
+        with self.lock:
+            if self.total_pages is not None:
+                return
+            self.total_pages = total_pages
+            queued = [page for page in range(1, total_pages + 1) if page not in self.done]
+            for page in queued:
+                self.pages.put(page)
+        print(f"Scheduler: queued {len(queued)} of {total_pages} pages")
+
+    def extend(self, total_pages):
+        """Queue pages past the known last page (the pagination may not show the last page)."""
+        with self.lock:
+            total_pages = max(total_pages, self.total_pages + 1)
+            for page in range(self.total_pages + 1, total_pages + 1):
+                if page not in self.done:
+                    self.pages.put(page)
+            self.total_pages = total_pages
+            self.changed.notify_all()
+
+    def next_page(self):
+        """
+        Return the next page number to scrape, or None when the queue is drained.
+        While another worker is on the last known page, waits to see whether it
+        extends the queue.
+        """
+        with self.changed:
+            while True:
+                try:
+                    page = self.pages.get_nowait()
+                except queue.Empty:
+                    if self.total_pages not in self.in_progress:
+                        return None
+                    self.changed.wait()
+                    continue
+                self.in_progress.add(page)
+                return page
+
+    def add_sink(self, sink):
+        """Call sink(page_data) for every page, in page order."""
+        self.sinks.append(sink)
+
+    def open_stream(self):
+        """Return a PageStream of every course, in page order, for a consumer thread."""
+        stream = PageStream()
+        self.add_sink(stream)
+        self.streams.append(stream)
+        return stream
+
+    def emit_ready(self):
+        # Called with the lock held.
+        while self.next_emit in self.pending or self.next_emit in self.failed:
+            page_data = self.pending.pop(self.next_emit, [])
+            for sink in self.sinks:
+                sink(page_data)
+            self.next_emit += 1
+
+    def restore(self, pages):
+        """Mark pages ({page: page_data}) finished by an earlier run as complete."""
+        with self.lock:
+            for page in sorted(pages):
+                self.done.add(page)
+                if self.keep_results:
+                    self.results[page] = pages[page]
+                self.pending[page] = pages[page]
+            self.emit_ready()
+        if pages:
+            print(f"Scheduler: restored {len(pages)} pages from the journal")
+
+    def complete(self, page, page_data):
+        if self.journal is not None:
+            self.journal.record(page, page_data)
+        with self.lock:
+            self.done.add(page)
+            if self.keep_results:
+                self.results[page] = page_data
+            self.pending[page] = page_data
+            self.in_progress.discard(page)
+            self.emit_ready()
+            self.changed.notify_all()
+
+    def fail(self, page):
+        with self.lock:
+            self.failed.append(page)
+            self.in_progress.discard(page)
+            self.emit_ready()
+            self.changed.notify_all()
+
+    def fail_remaining(self):
+        """Mark the pages still queued as failed (every worker stopped early); returns them."""
+        remaining = []
+        while True:
+            try:
+                remaining.append(self.pages.get_nowait())
+            except queue.Empty:
+                break
+        for page in remaining:
+            self.fail(page)
+        return remaining
+
+    def close(self, error=None):
+        """
+        Emit the pages still waiting on an earlier page, then end every stream
+        (or make it raise error when scraping failed).
+        """
+        with self.lock:
+            for page in sorted(self.pending):
+                for sink in self.sinks:
+                    sink(self.pending[page])
+            self.pending.clear()
+            for stream in self.streams:
+                stream.close(error)
+
+    def ordered_results(self):
+        all_course_data = []
+        for page in sorted(self.results):
+            all_course_data.extend(self.results[page])
+        return all_course_data
+
+
+def first_course(driver):
+    courses = driver.find_elements(By.CSS_SELECTOR, "app-course")
+    return courses[0] if courses else None
+
+
+def click_next(driver, num_clicks=1, stats=None, delay=2):
+    """Click the 'Next' link num_clicks times, waiting for each new page
+       (delay is the fixed sleep used by the "sleep" wait strategy).
+       Returns False if a click fails (no more pages)."""
+    for i in range(num_clicks):
+        next_page_links = driver.find_elements(By.XPATH, NEXT_LINK_XPATH)
+        if not next_page_links:
+            return False
+        next_link = next_page_links[0]
+        old_course, old_page = first_course(driver), current_page(driver)
+        driver.execute_script("arguments[0].scrollIntoView(true);", next_link)
+        next_link.click()
+        if stats:
+            stats.record_click()
+        ttb_wait.strategy.page_change(driver, old_course, old_page, delay)
+    return True
+
+
+def visible_page_links(driver):
+    """Map page number -> link element for the numbered links currently shown."""
+    links = {}
+    for link in driver.find_elements(By.CSS_SELECTOR, PAGE_LINK_CSS):
+        try:
+            text = link.text.strip()
+        except StaleElementReferenceException:
+            continue
+        if text.isdigit():
+            links[int(text)] = link
+    return links
+
+
+def current_page(driver):
+    """Return the active page number (1 if the pagination is missing)."""
+    active = driver.find_elements(By.CSS_SELECTOR, ACTIVE_PAGE_CSS)
+    if not active:
+        return 1
+    digits = "".join(ch for ch in active[0].text if ch.isdigit())
+    return int(digits) if digits else 1
+
+
+def read_total_pages(driver):
+    """Read the last page number from the pagination (1 if there is only one page)."""
+    links = visible_page_links(driver)
+    return max([current_page(driver)] + list(links))
+
+
+def go_to_page(driver, page, stats=None):
+    """
+    Jump straight to the given results page.
+    Types the page number when the pagination has an input box, otherwise clicks
+    the numbered link for the page, hopping via the closest visible link when the
+    target is outside the current window (the first or last page link when that
+    is the nearer end). Hops continue as long as each one gets closer.
+    Returns False if the page could not be reached.
+    """
+    page_inputs = driver.find_elements(By.CSS_SELECTOR, PAGE_INPUT_CSS)
+    old_page = current_page(driver)
+    if page_inputs and old_page != page:
+        old_course = first_course(driver)
+        page_input = page_inputs[0]
+        page_input.clear()
+        page_input.send_keys(str(page), Keys.ENTER)
+        if stats:
+            stats.record_click()
+        ttb_wait.strategy.page_change(driver, old_course, old_page, delay=2)
+
+    while True:
+        current = current_page(driver)
+        if current == page:
+            return True
+        links = visible_page_links(driver)
+        if not links:
+            return False
+        target = page if page in links else min(links, key=lambda n: abs(n - page))
+        if abs(target - page) >= abs(current - page):
+            return False
+        old_course = first_course(driver)
+        link = links[target]
+        driver.execute_script("arguments[0].scrollIntoView(true);", link)
+        driver.execute_script("arguments[0].click();", link)
+        if stats:
+            stats.record_click()
+        ttb_wait.strategy.page_change(driver, old_course, current, delay=2)
+        if current_page(driver) == current:
+            return False
@@ -0,0 +1,91 @@
+"""
+Streaming course output.
+
+CourseWriter appends courses to a newline-delimited JSON file (one course per line,
+gzip-compressed when the path ends in .gz) as pages are scraped, so nothing is held
+back until the end of the run. Running this module converts such a file to the
+legacy pretty-printed course_data.json:
+    python ttb_output.py course_data.ndjson.gz course_data.json
+"""
+import gzip
+import json
+import argparse
+import threading
+from ttb_records import plain
+
+OUTPUT_FORMATS = ["json", "ndjson", "ndjson.gz"]
+
+
+def open_text(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class CourseWriter:
+    """
+    Thread-safe NDJSON writer. Every write() is flushed, so a crash keeps every
+    page written before it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open_text(path, "w")
+        self.count = 0
+
+    def write(self, courses):
+        with self.lock:
+            for course in courses:
+                self.file.write(json.dumps(course, default=plain) + "\n")
+            self.file.flush()
+            self.count += len(courses)
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def iter_courses(path):
+    """Yield the courses of an NDJSON file one at a time."""
+    with open_text(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_courses(path):
+    """Courses of a course_data.json (legacy) or .ndjson(.gz) file."""
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return list(iter_courses(path))
+
+
+def write_legacy_json(courses, path):
+    """
+    Write courses (any iterable, dicts or records) to path exactly as
+    json.dump(courses, f, indent=4) would, one course at a time.
+    """
+    count = 0
+    with open(path, "w") as f:
+        for course in courses:
+            f.write("[\n    " if count == 0 else ",\n    ")
+            f.write(json.dumps(course, indent=4, default=plain).replace("\n", "\n    "))
+            count += 1
+        f.write("\n]" if count else "[]")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="NDJSON file written by --output ndjson or ndjson.gz")
+    parser.add_argument("destination", nargs="?", default="course_data.json",
+                        help="legacy JSON file to write (default: course_data.json)")
+    args = parser.parse_args()
+    count = write_legacy_json(iter_courses(args.source), args.destination)
+    print(f"Converted {count} courses to {args.destination}.")
+
+
+if __name__ == "__main__":
+    main()
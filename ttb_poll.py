@@ -0,0 +1,119 @@
+"""
+Availability polling between full scrapes.
+
+During enrolment, availability and waitlist change by the minute while the rest
+of a course does not. A poll reads only those two values for every section from
+the timetable backend over HTTP, skipping the notes' HTML and everything a full
+scrape then saves, packs and uploads. It compares them with the last known
+values and appends the differences to <prefix>availability.ndjson as one compact
+delta:
+    {"polled": ..., "seconds": ..., "sections": 5120,
+     "changed": [[code_title, session, section, availability, waitlist], ...],
+     "added": [...same...], "removed": [[code_title, session, section], ...]}
+The last known values are those of the previous poll (<prefix>availability.json),
+or of the term's course_data output when it is newer, which also tells the poll
+how many results pages to request at once.
+
+Most of a poll's time is its requests, so it asks for POLL_PAGE_SIZE courses
+per page rather than the site's 20: about one request for every 25 a full fetch
+makes. A backend that serves fewer per page (capped) is followed from the first
+page on, and the size it serves is kept in the state for the next poll.
+"""
+import os
+import json
+import math
+import time
+import datetime
+from ttb_http import DIVISIONS, TimetableClient, course_identity, section_availability, term_sessions
+from ttb_output import load_courses
+
+# Courses requested per results page (a page of them is about 1 MB of JSON).
+POLL_PAGE_SIZE = 500
+
+
+def course_availability(courses):
+    """{(code_title, session, section code): (availability, waitlist)} of scraped courses."""
+    values = {}
+    for course in courses:
+        for section in course["sections"]:
+            values[(course["code_title"], course["session"], section["code"])] = (
+                section.get("availability", "N/A"), section.get("waitlist", "N/A"))
+    return values
+
+
+def api_availability(api_courses):
+    """The same map, read straight from the backend's courses."""
+    values = {}
+    for course in api_courses:
+        code_title, session = course_identity(course)
+        for section in course.get("sections") or []:
+            values[(code_title, session, section.get("name", "N/A"))] = section_availability(section)
+    return values
+
+
+def availability_delta(old, new):
+    """Changed, added and removed sections from the old map to the new one."""
+    changed = [[*key, *value] for key, value in new.items() if key in old and old[key] != value]
+    added = [[*key, *value] for key, value in new.items() if key not in old]
+    removed = [list(key) for key in old if key not in new]
+    return {"changed": changed, "added": added, "removed": removed}
+
+
+class AvailabilityPoller:
+    """
+    Polls one term. course_data is the path of its full-scrape output; state and
+    deltas default to <prefix>availability.json and <prefix>availability.ndjson.
+    """
+
+    def __init__(self, term, course_data, api_url, max_workers=8, state=None, deltas=None,
+                 page_size=POLL_PAGE_SIZE):
+        self.term = term
+        self.course_data = course_data
+        self.state = state or f"{term.prefix}availability.json"
+        self.deltas = deltas or f"{term.prefix}availability.ndjson"
+        self.requested = page_size
+        self.client = TimetableClient(api_url, max_workers=max_workers, page_size=page_size,
+                                      adapt_page_size=True)
+
+    def baseline(self):
+        """(values, results pages) last known: the newer of the last poll and the course data."""
+        def modified(path):
+            return os.path.getmtime(path) if os.path.exists(path) else None
+
+        state_time, data_time = modified(self.state), modified(self.course_data)
+        if state_time is not None and (data_time is None or state_time >= data_time):
+            with open(self.state, encoding="utf-8") as f:
+                state = json.load(f)
+            values = {tuple(entry[:3]): tuple(entry[3:]) for entry in state["sections"]}
+            if state.get("requested") == self.requested:
+                # The page size the backend served for this request last time.
+                self.client.page_size = state["page_size"]
+            return values, math.ceil(state["courses"] / self.client.page_size)
+        if data_time is None:
+            return {}, 1
+        courses = load_courses(self.course_data)
+        return course_availability(courses), math.ceil(len(courses) / self.client.page_size)
+
+    def poll(self):
+        """Run one poll, append its delta and save the new state; returns the delta."""
+        start = time.perf_counter()
+        old, pages = self.baseline()
+        api_courses = self.client.fetch_courses(DIVISIONS, term_sessions(self.term.name), pages)
+        new = api_availability(api_courses)
+        polled = datetime.datetime.now().isoformat()
+        delta = {"polled": polled, "seconds": round(time.perf_counter() - start, 3), "sections": len(new)}
+        delta.update(availability_delta(old, new))
+        with open(self.deltas, "a", encoding="utf-8") as f:
+            f.write(json.dumps(delta, ensure_ascii=False, separators=(",", ":")) + "\n")
+        temporary = f"{self.state}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            # dumps, not dump: the C encoder only serializes whole strings.
+            f.write(json.dumps({"polled": polled, "courses": len(api_courses), "requested": self.requested,
+                                "page_size": self.client.page_size,
+                                "sections": [[*key, *value] for key, value in new.items()]},
+                               ensure_ascii=False, separators=(",", ":")))
+        os.replace(temporary, self.state)
+        return delta
+
+    def close(self):
+        self.client.close()
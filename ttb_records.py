@@ -0,0 +1,140 @@
+"""
+Compact course records.
+
+A scraped course is a dict holding a list of section dicts, and the same few
+values (campuses, sessions, delivery modes, enrolment controls, "N/A") repeat
+as separate strings in every one of them. compact_courses() turns courses into
+slotted Course and Section records whose string values are interned, so each
+distinct value is stored once and a record is a handful of pointers.
+
+Records serialize to exactly the JSON of the dicts they came from: a Section
+remembers which keys its dict had and in what order (the shared tuple of a
+common layout), and plain() / json.dumps(..., default=plain) turn records back
+into those dicts. They also index like the dicts (course["sections"],
+section.get("day_time")), so code reading courses works with either form.
+"""
+import sys
+
+COURSE_FIELDS = ("code_title", "campus", "session", "notes", "sections")
+
+# "meetings" holds the parsed day_time (ttb_schedule) when the scraper runs with --meetings.
+SECTION_FIELDS = ("code", "day_time", "location", "instructor", "availability", "waitlist",
+                  "enrollment_control", "delivery_mode", "meetings")
+
+# Key layouts seen so far, so every section with the same keys shares one tuple.
+_layouts = {}
+
+
+def intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def section_layout(keys):
+    keys = tuple(keys)
+    return _layouts.setdefault(keys, keys)
+
+
+class Record:
+    """Mapping-style access shared by Course and Section."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key not in self.keys():
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in self.keys()
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.keys() else default
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, dict)):
+            return plain(self) == plain(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({plain(self)!r})"
+
+
+class Section(Record):
+    __slots__ = ("layout",) + SECTION_FIELDS
+
+    def __init__(self, layout, values):
+        self.layout = layout
+        for field in SECTION_FIELDS:
+            setattr(self, field, None)
+        for field, value in zip(layout, values):
+            setattr(self, field, intern(value))
+
+    def keys(self):
+        return self.layout
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.layout}
+
+
+class Course(Record):
+    __slots__ = COURSE_FIELDS
+
+    def __init__(self, code_title, campus, session, notes, sections):
+        self.code_title = code_title
+        self.campus = intern(campus)
+        self.session = intern(session)
+        self.notes = intern(notes)
+        self.sections = tuple(sections)
+
+    def keys(self):
+        return COURSE_FIELDS
+
+    def to_dict(self):
+        return {
+            "code_title": self.code_title,
+            "campus": self.campus,
+            "session": self.session,
+            "notes": self.notes,
+            "sections": [section.to_dict() for section in self.sections],
+        }
+
+
+def compact_section(section):
+    """A Section for a section dict, or None if it has keys a Section cannot hold."""
+    if isinstance(section, Section):
+        return section
+    if not set(section) <= set(SECTION_FIELDS):
+        return None
+    return Section(section_layout(section), section.values())
+
+
+def compact_course(course):
+    """
+    A Course for a course dict. A dict with other keys, or keys in another order,
+    is returned unchanged, since a record could not reproduce its JSON.
+    """
+    if isinstance(course, Course) or tuple(course) != COURSE_FIELDS:
+        return course
+    sections = [compact_section(section) for section in course["sections"]]
+    if None in sections:
+        return course
+    return Course(course["code_title"], course["campus"], course["session"], course["notes"], sections)
+
+
+def compact_courses(courses):
+    return [compact_course(course) for course in courses]
+
+
+def plain(value):
+    """
+    The dict form of a record (anything else is returned unchanged). Passed as
+    json.dumps(..., default=plain), it serializes records as their dicts.
+    """
+    if isinstance(value, Record):
+        return value.to_dict()
+    return value
@@ -0,0 +1,186 @@
+"""
+Meeting times and timetable conflicts.
+
+A section's day_time is display text such as "Monday9:00 - 11:00Tuesday19:00 - 20:00".
+parse_meetings() turns it into (day, start, end) intervals: day 0 is Monday,
+start and end are minutes after midnight. With --meetings the scraper stores
+them next to the text as section["meetings"] = [{"day": ..., "start": ...,
+"end": ...}, ...] (maps, since Firestore does not allow arrays in arrays).
+
+For conflict checks, a section's weekly occupancy is a bitset (a Python int)
+with one bit per SLOT_MINUTES of the week, repeated for each half of the term
+its course's session covers (F, S, or both for Y), so two sections conflict
+exactly when their masks share a bit. generate_schedules() enumerates the
+conflict-free choices of one section of each kind (LEC, TUT, PRA) for a set of
+course codes, a depth-first search that ANDs masks and prunes on the first
+clash. Running this module lists them from a course_data file:
+    python ttb_schedule.py fall_winter_course_data.json CSC148H1 MAT137Y1 --limit 5
+"""
+import re
+import argparse
+from ttb_output import load_courses
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+MEETING_RE = re.compile(r"(" + "|".join(DAYS) + r")\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})")
+
+# Resolution of the occupancy bitsets; meetings are widened to whole slots.
+SLOT_MINUTES = 5
+
+WEEK_SLOTS = 7 * 24 * 60 // SLOT_MINUTES
+
+# Term halves a session occupies: bit 0 the first (F), bit 1 the second (S).
+FIRST_HALF = 1
+SECOND_HALF = 2
+
+
+def parse_meetings(day_time):
+    """(day, start minute, end minute) for every meeting in a day_time text, in order."""
+    meetings = []
+    for day, start_hour, start_minute, end_hour, end_minute in MEETING_RE.findall(day_time or ""):
+        meetings.append((DAYS.index(day), int(start_hour) * 60 + int(start_minute),
+                         int(end_hour) * 60 + int(end_minute)))
+    return meetings
+
+
+def add_meetings(courses):
+    """Store each section's parsed meetings under "meetings"; returns courses."""
+    for course in courses:
+        for section in course["sections"]:
+            section["meetings"] = [{"day": day, "start": start, "end": end}
+                                   for day, start, end in parse_meetings(section.get("day_time"))]
+    return courses
+
+
+def section_meetings(section):
+    meetings = section.get("meetings")
+    if meetings is None:
+        return parse_meetings(section.get("day_time"))
+    return [(meeting["day"], meeting["start"], meeting["end"]) for meeting in meetings]
+
+
+def session_halves(session):
+    """Term halves of a session such as "2025 Fall (F)"; unknown sessions occupy both."""
+    if session.endswith("(F)"):
+        return FIRST_HALF
+    if session.endswith("(S)"):
+        return SECOND_HALF
+    return FIRST_HALF | SECOND_HALF
+
+
+def week_mask(meetings):
+    mask = 0
+    for day, start, end in meetings:
+        first = (day * 1440 + start) // SLOT_MINUTES
+        last = -(-(day * 1440 + end) // SLOT_MINUTES)
+        if last > first:
+            mask |= ((1 << (last - first)) - 1) << first
+    return mask
+
+
+def occupancy(meetings, session="N/A"):
+    """Bitset of the slots the meetings take up in the halves of the term the session covers."""
+    week = week_mask(meetings)
+    halves = session_halves(session)
+    mask = 0
+    if halves & FIRST_HALF:
+        mask |= week
+    if halves & SECOND_HALF:
+        mask |= week << WEEK_SLOTS
+    return mask
+
+
+def section_occupancy(course, section):
+    return occupancy(section_meetings(section), course["session"])
+
+
+def section_kind(section):
+    """LEC, TUT or PRA (the letters of the section code)."""
+    return section["code"].rstrip("0123456789")
+
+
+def course_code(course):
+    return course["code_title"].split(" - ", 1)[0]
+
+
+def course_slots(course):
+    """
+    The choices a schedule makes for one course: for each kind of section it has,
+    the (mask, section) options, fewest options first.
+    """
+    kinds = {}
+    for section in course["sections"]:
+        kinds.setdefault(section_kind(section), []).append((section_occupancy(course, section), section))
+    return sorted(kinds.items(), key=lambda item: len(item[1]))
+
+
+def generate_schedules(courses, codes, session=None, limit=None):
+    """
+    Yield conflict-free schedules for the course codes (e.g. "CSC148H1"): lists of
+    (course, section) with one section of every kind each chosen course has. A
+    code offered in several sessions takes one of them (only session, if given).
+    Raises KeyError for a code with no matching course.
+    """
+    offerings = []
+    for code in codes:
+        matches = [(course, course_slots(course)) for course in courses
+                   if course_code(course) == code and (session is None or course["session"] == session)]
+        if not matches:
+            raise KeyError(code)
+        offerings.append(matches)
+    # Codes with the fewest choices first, so clashes are found near the root.
+    offerings.sort(key=lambda matches: sum(len(options) for course, slots in matches for kind, options in slots))
+
+    chosen = []
+    produced = 0
+
+    def pick_slots(course, slots, index, used, rest):
+        if index == len(slots):
+            yield from pick_course(rest, used)
+            return
+        for mask, section in slots[index][1]:
+            if mask & used:
+                continue
+            chosen.append((course, section))
+            yield from pick_slots(course, slots, index + 1, used | mask, rest)
+            chosen.pop()
+
+    def pick_course(index, used):
+        if index == len(offerings):
+            yield list(chosen)
+            return
+        for course, slots in offerings[index]:
+            yield from pick_slots(course, slots, 0, used, index + 1)
+
+    for schedule in pick_course(0, 0):
+        yield schedule
+        produced += 1
+        if limit is not None and produced >= limit:
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="course_data.json, .ndjson or .ndjson.gz written by the scraper")
+    parser.add_argument("codes", nargs="+", help="course codes, e.g. CSC148H1")
+    parser.add_argument("--session", help="only offerings in this session, e.g. \"2025 Fall (F)\"")
+    parser.add_argument("--limit", type=int, default=10, help="schedules to list (default: 10, 0: all)")
+    args = parser.parse_args()
+
+    courses = load_courses(args.source)
+    count = 0
+    try:
+        for schedule in generate_schedules(courses, args.codes, args.session, args.limit or None):
+            count += 1
+            print(f"Schedule {count}:")
+            for course, section in schedule:
+                print(f"  {course_code(course):<10} {section['code']:<8} {course['session']:<28} "
+                      f"{section.get('day_time', 'N/A')}")
+    except KeyError as e:
+        parser.error(f"no course {e.args[0]} in {args.source}")
+    if not count:
+        print("No conflict-free schedule.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import queue
+import threading
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+import ttb_wait
+
+DIVISION_OPTION_CSS = "#division-combo-bottom-container app-ttb-option"
+SESSION_OPTION_CSS = "#session-combo-bottom-container app-ttb-option"
+SEARCH_BUTTON_XPATH = "//button[normalize-space()='Search']"
+
+# Clicks the wanted filter options in one call: arguments are the option selector,
+# the option indices (null for all) and how many options to consider (null for all).
+SELECT_OPTIONS_JS = r"""
+var options = Array.prototype.slice.call(document.querySelectorAll(arguments[0]));
+if (arguments[2] !== null) {
+    options = options.slice(0, arguments[2]);
+}
+var indices = arguments[1];
+if (indices !== null) {
+    options = indices.filter(function (i) { return i < options.length; })
+        .map(function (i) { return options[i]; });
+}
+options.forEach(function (option) { option.click(); });
+return options.length;
+"""
+
+# Selection state of every option matching the selector: true or false when the
+# option exposes it (a checkbox, aria-selected/aria-checked, a "selected" class),
+# null when it cannot be told.
+OPTION_STATE_JS = r"""
+return Array.prototype.map.call(document.querySelectorAll(arguments[0]), function (option) {
+    var input = option.querySelector("input[type=checkbox]");
+    if (input) {
+        return input.checked;
+    }
+    var marked = option.matches("[aria-selected], [aria-checked]") ? option
+        : option.querySelector("[aria-selected], [aria-checked]");
+    if (marked) {
+        return (marked.getAttribute("aria-selected") || marked.getAttribute("aria-checked")) === "true";
+    }
+    if (option.querySelector(".selected, .active, .checked") ||
+            /\b(selected|active|checked)\b/.test(option.className)) {
+        return true;
+    }
+    return null;
+});
+"""
+
+
+def wait_for_options(driver, select_id, option_css):
+    """Wait for a filter dropdown and its options, and return the option elements."""
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.ID, select_id))
+    )
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_all_elements_located((By.CSS_SELECTOR, option_css))
+    )
+    return driver.find_elements(By.CSS_SELECTOR, option_css)
+
+
+def count_options(driver, select_id, option_css, limit=None):
+    """Number of options in a filter dropdown, capped at limit."""
+    count = len(wait_for_options(driver, select_id, option_css))
+    return min(count, limit) if limit is not None else count
+
+
+def select_options(driver, select_id, option_css, indices=None, limit=None, delay=0.1):
+    """
+    Click filter options in a dropdown.
+    Only the first limit options are considered (all of them if limit is None),
+    and of those only the given indices (all of them if indices is None).
+    delay is the fixed sleep after each click used by the "sleep" wait strategy.
+    Returns the number of options clicked.
+    """
+    options = wait_for_options(driver, select_id, option_css)
+    if limit is not None:
+        options = options[:limit]
+    if indices is not None:
+        options = [options[i] for i in indices if i < len(options)]
+    for option in options:
+        driver.execute_script("arguments[0].scrollIntoView(true);", option)
+        driver.execute_script("arguments[0].click();", option)
+        ttb_wait.strategy.option_clicked(driver, delay)
+    return len(options)
+
+
+def select_options_in_page(driver, select_id, option_css, indices=None, limit=None, delay=0.1):
+    """
+    Select filter options like select_options, but click them all in one in-page
+    call and wait once. The selection is then read back, and any wanted option
+    that reports itself unselected is clicked again one at a time.
+    Returns the number of options selected.
+    """
+    options = wait_for_options(driver, select_id, option_css)
+    available = len(options) if limit is None else min(len(options), limit)
+    wanted = range(available) if indices is None else [i for i in indices if i < available]
+    count = driver.execute_script(SELECT_OPTIONS_JS, option_css,
+                                  None if indices is None else list(indices), limit)
+    ttb_wait.strategy.option_clicked(driver, delay)
+    states = driver.execute_script(OPTION_STATE_JS, option_css)
+    missing = [i for i in wanted if i < len(states) and states[i] is False]
+    if missing:
+        print(f"Filters: {len(missing)} {select_id} options did not stick, clicking them again")
+        select_options(driver, select_id, option_css, missing, limit, delay)
+    return count
+
+
+def submit_search(driver):
+    """
+    Click the Search button and wait for the results.
+    Returns False if the "No results found" message appears.
+    """
+    search_button = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.XPATH, SEARCH_BUTTON_XPATH))
+    )
+    driver.execute_script("arguments[0].scrollIntoView(true);", search_button)
+    driver.execute_script("arguments[0].click();", search_button)
+    return ttb_wait.strategy.search_results(driver)
+
+
+class SearchLinks:
+    """
+    Results-page URLs learned from completed searches, keyed by their filter
+    selection. A URL is only kept when it differs from the search page, i.e. when
+    the app encoded the filters in it, so a later search with the same filters
+    can load it directly instead of selecting them again.
+    """
+
+    def __init__(self, search_url):
+        self.lock = threading.Lock()
+        self.search_url = search_url
+        self.links = {}
+
+    def learn(self, key, url):
+        if url.rstrip("/") == self.search_url.rstrip("/"):
+            return
+        with self.lock:
+            self.links[key] = url
+
+    def get(self, key):
+        with self.lock:
+            return self.links.get(key)
+
+    def forget(self, key):
+        with self.lock:
+            self.links.pop(key, None)
+
+
+class ShardScheduler:
+    """
+    Splits the search into independent (division, session) shards.
+    Each shard is a separate, smaller search that a worker paginates to the end,
+    so workers never share a result set. session is None when sessions are not
+    sharded (the shard then covers every selected session).
+    """
+
+    def __init__(self, shard_sessions=False):
+        self.lock = threading.Lock()
+        self.shard_sessions = shard_sessions
+        self.shards = queue.Queue()
+        self.populated = False
+        self.results = {}
+
+    def populate(self, num_divisions, num_sessions=0):
+        with self.lock:
+            if self.populated:
+                return
+            self.populated = True
+            if self.shard_sessions and num_sessions:
+                sessions = list(range(num_sessions))
+            else:
+                sessions = [None]
+            count = 0
+            for division in range(num_divisions):
+                for session in sessions:
+                    self.shards.put((division, session))
+                    count += 1
+        print(f"Shards: queued {count} searches "
+              f"({num_divisions} divisions x {len(sessions)} session groups)")
+
+    def next_shard(self):
+        """Return the next (division, session) shard, or None when all are taken."""
+        try:
+            return self.shards.get_nowait()
+        except queue.Empty:
+            return None
+
+    def complete(self, shard, shard_data):
+        with self.lock:
+            self.results[shard] = shard_data
+
+    def merged_results(self):
+        """Concatenate the shards in order, dropping courses already seen in another shard."""
+        all_course_data = []
+        seen = set()
+        for shard in sorted(self.results, key=lambda s: (s[0], -1 if s[1] is None else s[1])):
+            for course in self.results[shard]:
+                key = (course["code_title"], course["session"])
+                if course["session"] != "N/A":
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                all_course_data.append(course)
+        return all_course_data
@@ -0,0 +1,165 @@
+"""
+Raw page snapshots and offline re-parsing.
+
+With --snapshots DIR, the scraper saves the expanded HTML of every results page
+it reads, gzip-compressed and content-addressed (DIR/objects/ab/abcdef....html.gz,
+named by the SHA-256 of the HTML, so identical pages are stored once across runs).
+DIR/<prefix>index.ndjson lists, for each term, which snapshot holds which page
+and in what order the run assembled them. Running this module rebuilds the
+term's output from the snapshots with the current parser, in parallel and
+without a browser:
+    python ttb_snapshots.py snapshots/summer_index.ndjson                # -> summer_course_data.json
+    python ttb_snapshots.py snapshots/summer_index.ndjson out.ndjson.gz --workers 8
+"""
+import os
+import gzip
+import json
+import hashlib
+import argparse
+import datetime
+import warnings
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from course_parser import parse_courses_html
+from ttb_output import CourseWriter, write_legacy_json
+from ttb_search import ShardScheduler
+from ttb_schedule import add_meetings
+
+
+class SnapshotStore:
+    """
+    Content-addressed page snapshots shared by every term of a run, with one
+    index per term. open() starts a term's index (appending to it on resume,
+    so the pages kept from an interrupted run stay listed); record() saves a
+    page's HTML and lists it under its order key.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.indexes = {}
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+
+    def index_path(self, term):
+        return os.path.join(self.directory, f"{term.prefix}index.ndjson")
+
+    def object_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], f"{digest}.html.gz")
+
+    def open(self, term, scheduler, resume=False):
+        path = self.index_path(term)
+        header = {"term": term.name, "scheduler": scheduler, "started": datetime.datetime.now().isoformat()}
+        with self.lock:
+            self.indexes[term.name] = index = open(path, "a" if resume else "w", encoding="utf-8")
+            index.write(json.dumps(header) + "\n")
+            index.flush()
+
+    def save(self, html):
+        """Store html once under its SHA-256 and return the digest."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(temporary, "wb", compresslevel=6) as f:
+                f.write(data)
+            os.replace(temporary, path)
+        return digest
+
+    def record(self, term, order, html):
+        digest = self.save(html)
+        with self.lock:
+            index = self.indexes[term.name]
+            index.write(json.dumps({"order": list(order), "sha256": digest}) + "\n")
+            index.flush()
+
+    def close(self, term):
+        with self.lock:
+            index = self.indexes.pop(term.name, None)
+        if index is not None:
+            index.close()
+
+
+def load_index(path):
+    """
+    Read an index: returns (scheduler, entries), where entries maps each order key
+    to its snapshot digest. A page listed twice (scraped again after a resume)
+    keeps its last snapshot.
+    """
+    scheduler = "queue"
+    entries = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if "scheduler" in entry:
+                scheduler = entry["scheduler"]
+            elif "order" in entry:
+                entries[tuple(entry["order"])] = entry["sha256"]
+    return scheduler, entries
+
+
+def parse_snapshot(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return parse_courses_html(f.read())
+
+
+def order_key(order):
+    # Shard keys hold a None session when sessions were not sharded; it sorts first.
+    return tuple(-1 if part is None else part for part in order)
+
+
+def reparse(index_path, workers=None):
+    """
+    Parse every snapshot listed in an index in a process pool and assemble the
+    courses the way the run did: queue pages in page order, stride pages per
+    worker, shards merged with ShardScheduler's duplicate removal.
+    """
+    directory = os.path.dirname(index_path)
+    scheduler, entries = load_index(index_path)
+    orders = sorted(entries, key=order_key)
+    paths = [os.path.join(directory, "objects", entries[order][:2], f"{entries[order]}.html.gz")
+             for order in orders]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pages = list(executor.map(parse_snapshot, paths, chunksize=max(1, len(paths) // 64)))
+    if scheduler == "shard":
+        shards = ShardScheduler()
+        for order, page_data in zip(orders, pages):
+            shards.results.setdefault((order[0], order[1]), []).extend(page_data)
+        return shards.merged_results()
+    return [course for page_data in pages for course in page_data]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("index", help="a term's index, e.g. snapshots/summer_index.ndjson")
+    parser.add_argument("destination", nargs="?",
+                        help="output file: .json (legacy format), .ndjson or .ndjson.gz "
+                             "(default: <prefix>course_data.json)")
+    parser.add_argument("--workers", type=int, help="parser processes (default: one per CPU)")
+    parser.add_argument("--meetings", action="store_true",
+                        help="also store each section's parsed day_time, like the scraper's --meetings")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", FutureWarning)  # soupsieve's :contains deprecation
+
+    destination = args.destination
+    if destination is None:
+        prefix = os.path.basename(args.index)[:-len("index.ndjson")]
+        destination = f"{prefix}course_data.json"
+    courses = reparse(args.index, args.workers)
+    if args.meetings:
+        add_meetings(courses)
+    if destination.endswith(".json"):
+        write_legacy_json(courses, destination)
+    else:
+        writer = CourseWriter(destination)
+        writer.write(courses)
+        writer.close()
+    print(f"Re-parsed {len(courses)} courses into {destination}.")
+
+
+if __name__ == "__main__":
+    main()
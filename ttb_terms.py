@@ -0,0 +1,23 @@
+class TermProfile:
+    """
+    One term the scraper can run. prefix namespaces its Firestore documents,
+    manifest, journal and output files; session_limit is how many
+    #session-combo-bottom-container options its search selects (None selects
+    every session, 0 leaves the session filter unset). The name is also the
+    term ttb_http.term_sessions requests in HTTP fetch mode.
+    """
+
+    def __init__(self, name, prefix, session_limit):
+        self.name = name
+        self.prefix = prefix
+        self.session_limit = session_limit
+
+    def __repr__(self):
+        return f"TermProfile({self.name!r}, {self.prefix!r}, {self.session_limit!r})"
+
+
+TERMS = {
+    "fall_winter": TermProfile("fall_winter", "fall_winter_", 0),
+    "next_fall_winter": TermProfile("next_fall_winter", "next_fall_winter_", None),
+    "summer": TermProfile("summer", "summer_", 6),
+}
@@ -0,0 +1,204 @@
+import time
+import threading
+from contextlib import contextmanager
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+
+NO_RESULTS_CSS = "div.alert-info.results-error-info"
+
+# Asynchronous JavaScript that calls back once the page's network activity is idle:
+# Angular's testabilities when the app exposes them (no pending HTTP requests or timers),
+# otherwise once no new resource has been fetched for quietMs.
+NETWORK_IDLE_JS = r"""
+var quietMs = arguments[0];
+var done = arguments[arguments.length - 1];
+if (window.getAllAngularTestabilities && window.getAllAngularTestabilities().length) {
+    var testabilities = window.getAllAngularTestabilities();
+    var remaining = testabilities.length;
+    testabilities.forEach(function (testability) {
+        testability.whenStable(function () {
+            remaining--;
+            if (remaining === 0) {
+                done(true);
+            }
+        });
+    });
+} else {
+    var count = performance.getEntriesByType("resource").length;
+    var since = Date.now();
+    (function poll() {
+        var current = performance.getEntriesByType("resource").length;
+        if (current !== count) {
+            count = current;
+            since = Date.now();
+        }
+        if (Date.now() - since >= quietMs) {
+            done(true);
+            return;
+        }
+        setTimeout(poll, 25);
+    })();
+}
+"""
+
+# True once the accordion button reports itself expanded or its course body is rendered.
+ACCORDION_EXPANDED_JS = r"""
+var button = arguments[0];
+var course = button.closest("app-course");
+return button.getAttribute("aria-expanded") === "true" ||
+    !!(course && course.querySelector(".accordion-body"));
+"""
+
+
+class WaitTimer:
+    """Thread-safe total time spent waiting, per phase."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seconds = {}
+        self.counts = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.seconds[name] = self.seconds.get(name, 0.0) + elapsed
+                self.counts[name] = self.counts.get(name, 0) + 1
+
+    def report(self):
+        with self.lock:
+            for name in sorted(self.seconds):
+                print(f"Waiting ({name}): {self.seconds[name]:.1f}s over {self.counts[name]} waits")
+
+
+class SleepWait:
+    """Fixed sleeps after every action (the original behaviour)."""
+
+    name = "sleep"
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self.timer = WaitTimer()
+
+    def page_change(self, driver, old_course, old_page, delay):
+        """Wait for a new results page after a pagination click."""
+        with self.timer.phase("pagination"):
+            time.sleep(delay)
+            WebDriverWait(driver, self.timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "app-course"))
+            )
+
+    def option_clicked(self, driver, delay):
+        """Wait after clicking a filter option."""
+        with self.timer.phase("filters"):
+            time.sleep(delay)
+
+    def search_results(self, driver):
+        """Wait for the search results. Returns False if "No results found" appears."""
+        with self.timer.phase("search"):
+            try:
+                WebDriverWait(driver, 5).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, NO_RESULTS_CSS))
+                )
+                return False
+            except Exception:
+                # If the error message is not found within 5 seconds, continue.
+                pass
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "app-course"))
+            )
+            return True
+
+    def accordion_clicked(self, driver, button, delay):
+        """Wait after clicking an accordion button."""
+        with self.timer.phase("accordions"):
+            time.sleep(delay)
+
+
+class SignalWait(SleepWait):
+    """
+    Waits on concrete page signals instead of fixed sleeps: the first app-course
+    being replaced (or, on a page without one, the active page number changing),
+    network idle, the accordion reporting itself expanded. timeout is the
+    fallback for each wait.
+    """
+
+    name = "signal"
+
+    def page_change(self, driver, old_course, old_page, delay):
+        from ttb_navigation import current_page
+
+        # The pagination may switch its active page before the new results are
+        # rendered, so while there is an old course only its replacement counts.
+        old_text = None
+        if old_course is not None:
+            try:
+                old_text = old_course.text
+            except StaleElementReferenceException:
+                pass
+
+        def changed(driver):
+            if old_course is not None:
+                try:
+                    return old_course.text != old_text
+                except StaleElementReferenceException:
+                    return True
+            return old_page is not None and current_page(driver) != old_page
+
+        with self.timer.phase("pagination"):
+            try:
+                WebDriverWait(driver, self.timeout, poll_frequency=0.05).until(changed)
+            except TimeoutException:
+                pass
+            WebDriverWait(driver, self.timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "app-course"))
+            )
+
+    def network_idle(self, driver, quiet_ms=100):
+        driver.set_script_timeout(self.timeout)
+        try:
+            driver.execute_async_script(NETWORK_IDLE_JS, quiet_ms)
+        except TimeoutException:
+            pass
+
+    def option_clicked(self, driver, delay):
+        with self.timer.phase("filters"):
+            self.network_idle(driver)
+
+    def search_results(self, driver):
+        with self.timer.phase("search"):
+            WebDriverWait(driver, max(self.timeout, 20), poll_frequency=0.05).until(
+                EC.any_of(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "app-course")),
+                    EC.presence_of_element_located((By.CSS_SELECTOR, NO_RESULTS_CSS)),
+                )
+            )
+            return not driver.find_elements(By.CSS_SELECTOR, NO_RESULTS_CSS)
+
+    def accordion_clicked(self, driver, button, delay):
+        with self.timer.phase("accordions"):
+            try:
+                WebDriverWait(driver, self.timeout, poll_frequency=0.05).until(
+                    lambda driver: driver.execute_script(ACCORDION_EXPANDED_JS, button)
+                )
+            except TimeoutException:
+                pass
+
+
+WAIT_STRATEGIES = {SleepWait.name: SleepWait, SignalWait.name: SignalWait}
+
+# The strategy used by the navigation, search and accordion helpers.
+strategy = SignalWait()
+
+
+def use_strategy(name, timeout=10):
+    """Switch every helper to the named wait strategy ("signal" or "sleep")."""
+    global strategy
+    strategy = WAIT_STRATEGIES[name](timeout)
+    return strategy
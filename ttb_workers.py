@@ -0,0 +1,184 @@
+"""
+Worker-count tuning for --threads auto.
+
+worker_limit() is how many browsers the host can run: a few per CPU, and as many
+as fit in the available memory at the measured (or assumed) RSS per browser.
+WorkerController sizes the queue-mode workers of a term: it starts with
+START_WORKERS (capped by the page count and the limit), then, every few pages,
+estimates throughput from the per-page latency and adds a worker while that
+keeps improving throughput, and removes one on errors, memory pressure, or when
+the last addition did not help.
+"""
+import os
+import statistics
+import threading
+from ttb_driver import browser_rss
+
+# Workers to start with, the old fixed default.
+START_WORKERS = 5
+
+# Browsers per CPU: a worker mostly waits on the network and the page.
+WORKERS_PER_CPU = 2
+
+# Assumed RSS of a browser (chromedriver and Chrome) before one has been measured.
+BROWSER_MB = 350
+
+# Share of the available memory the browsers may use.
+MEMORY_FRACTION = 0.7
+
+# Pages per adjustment at each worker count (at least two per worker).
+ADJUST_PAGES = 10
+
+# An added worker must raise the estimated throughput by this much to be kept.
+MIN_GAIN = 1.05
+
+
+def available_memory():
+    """Memory available for new processes, in bytes (None if unknown)."""
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def cpu_count():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def worker_limit(browser_bytes=None, running=0, max_workers=None):
+    """
+    Most browsers the host should run: WORKERS_PER_CPU per CPU, and as many as fit
+    in MEMORY_FRACTION of the available memory at browser_bytes each (running
+    browsers already hold their share, so they are added back).
+    """
+    browser_bytes = browser_bytes or BROWSER_MB * 2 ** 20
+    limit = cpu_count() * WORKERS_PER_CPU
+    memory = available_memory()
+    if memory is not None:
+        limit = min(limit, running + int(memory * MEMORY_FRACTION // browser_bytes))
+    if max_workers:
+        limit = min(limit, max_workers)
+    return max(1, limit)
+
+
+class WorkerController:
+    """
+    Sizes the queue-mode workers of one term while it runs. start_worker(index)
+    submits a worker and returns its future. The first worker to reach the
+    results calls plan() with the page count and its browser, which starts the
+    other workers. Workers report every page (record_page) and failure
+    (record_error), and stop when keep_running() returns False.
+    """
+
+    def __init__(self, start_worker, remaining, max_workers=None):
+        self.lock = threading.Lock()
+        self.start_worker = start_worker
+        self.remaining = remaining
+        self.max_workers = max_workers
+        self.browser_bytes = None
+        self.target = 1
+        self.active = set()
+        self.futures = []
+        self.planned = False
+        self.latencies = []
+        self.errors = 0
+        self.best = None
+        self.growing = True
+        self.history = []
+
+    def launch(self):
+        """Start workers (lowest free indices first) until target are running."""
+        with self.lock:
+            indices = []
+            index = 0
+            while len(self.active) + len(indices) < self.target:
+                if index not in self.active:
+                    indices.append(index)
+                index += 1
+            self.active.update(indices)
+        for index in indices:
+            future = self.start_worker(index)
+            with self.lock:
+                self.futures.append(future)
+
+    def plan(self, total_pages, driver):
+        """Set the starting worker count once the page count and a browser's RSS are known."""
+        with self.lock:
+            if self.planned:
+                return
+            self.planned = True
+            self.browser_bytes = browser_rss(driver)
+            limit = worker_limit(self.browser_bytes, len(self.active), self.max_workers)
+            self.target = max(1, min(START_WORKERS, limit, total_pages))
+            self.history.append(self.target)
+        browser_mb = f"{self.browser_bytes / 2 ** 20:.0f} MiB" if self.browser_bytes else "unknown"
+        print(f"Workers: starting {self.target} for {total_pages} pages "
+              f"(limit {limit}, browser RSS {browser_mb})")
+        self.launch()
+
+    def keep_running(self, index):
+        """False once the worker should stop (it is above the target); it is then retired."""
+        with self.lock:
+            if index < self.target:
+                return True
+            self.active.discard(index)
+            return False
+
+    def record_page(self, seconds):
+        with self.lock:
+            self.latencies.append(seconds)
+            if len(self.latencies) < max(ADJUST_PAGES, 2 * self.target):
+                return
+            changed = self.adjust()
+        if changed:
+            self.launch()
+
+    def record_error(self):
+        with self.lock:
+            self.errors += 1
+
+    def adjust(self):
+        """Pick the next target from the last window of pages (lock held). Returns True if it grew."""
+        throughput = len(self.active) / statistics.median(self.latencies)
+        previous = self.target
+        limit = worker_limit(self.browser_bytes, len(self.active), self.max_workers)
+        if self.errors or limit < self.target:
+            # Errors or memory pressure: back off and stop growing.
+            self.target = max(1, min(self.target - 1, limit))
+            self.growing = False
+        elif self.best is not None and throughput < self.best * MIN_GAIN and self.growing:
+            # The last worker added did not pay for itself.
+            self.target = max(1, self.target - 1)
+            self.growing = False
+        elif self.growing and self.target < limit and self.remaining() > 2 * self.target:
+            self.best = throughput
+            self.target += 1
+        self.latencies = []
+        self.errors = 0
+        if self.target != previous:
+            self.history.append(self.target)
+            print(f"Workers: {previous} -> {self.target} "
+                  f"({throughput:.2f} pages/s estimated at {previous})")
+        return self.target > previous
+
+    def join(self):
+        """Wait for every worker, including ones started while waiting; raises a worker's error."""
+        done = 0
+        while True:
+            with self.lock:
+                if done == len(self.futures):
+                    return
+                future = self.futures[done]
+            future.result()
+            done += 1